@@ -137,9 +137,66 @@ class UserStatsAdmin(admin.ModelAdmin):
     readonly_fields = ("last_updated",)
 
 
+@admin.register(XPSnapshot)
+class XPSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("user", "date", "total_xp", "github_xp", "leetcode_xp", "gfg_xp")
+    search_fields = ("user__username",)
+    date_hierarchy = "date"
+
+
 @admin.register(LeaderboardEntry)
 class LeaderboardEntryAdmin(admin.ModelAdmin):
     list_display = ("rank", "user", "xp", "calculated_at")
     ordering = ("rank",)
     search_fields = ("user__username",)
     readonly_fields = ("calculated_at",)
+
+
+@admin.register(JobWatermark)
+class JobWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("name", "value", "updated_at")
+    search_fields = ("name",)
+    readonly_fields = ("updated_at",)
+
+
+@admin.register(RoadmapCache)
+class RoadmapCacheAdmin(admin.ModelAdmin):
+    list_display = ("normalized_title", "title", "hits", "created_at", "last_used_at")
+    search_fields = ("normalized_title", "title")
+    readonly_fields = ("key", "hits", "created_at", "last_used_at")
+
+
+@admin.register(MetricCounter)
+class MetricCounterAdmin(admin.ModelAdmin):
+    list_display = ("name", "date", "value")
+    list_filter = ("name",)
+    date_hierarchy = "date"
+
+
+@admin.register(AIUsageDaily)
+class AIUsageDailyAdmin(admin.ModelAdmin):
+    list_display = (
+        "date", "user", "feature", "model", "calls", "errors",
+        "prompt_tokens", "completion_tokens", "cost", "total_ms", "max_ms",
+    )
+    list_filter = ("feature", "model")
+    search_fields = ("user__username",)
+    date_hierarchy = "date"
+
+    def changelist_view(self, request, extra_context=None):
+        from core.services.ai_usage import usage_report
+
+        extra_context = extra_context or {}
+        extra_context["report"] = usage_report()
+        return super().changelist_view(request, extra_context=extra_context)
+
+
+@admin.register(AIQuota)
+class AIQuotaAdmin(admin.ModelAdmin):
+    list_display = ("user", "tokens", "updated_at")
+    search_fields = ("user__username",)
+
+
+@admin.register(AISlot)
+class AISlotAdmin(admin.ModelAdmin):
+    list_display = ("id", "token", "leased_until")
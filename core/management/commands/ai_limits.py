@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.services.metrics import get_totals
+
+METRICS = [
+    "ai_limits.admitted",
+    "ai_limits.rejected.quota",
+    "ai_limits.rejected.busy",
+    "ai_limits.rejected.contention",
+    "ai_limits.queued",
+    "ai_limits.queue_ms",
+]
+
+
+class Command(BaseCommand):
+    help = "Show AI admission, load-shedding and slot queue-time counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=1)
+
+    def handle(self, *args, **options):
+        totals = get_totals(METRICS, options["days"])
+
+        for name in METRICS:
+            self.stdout.write(f"{name:<32} {totals[name]}")
+
+        queued = totals["ai_limits.queued"]
+        if queued:
+            self.stdout.write(f"Avg queue time: {totals['ai_limits.queue_ms'] // queued} ms")
+
+        self.stdout.write(self.style.SUCCESS("✅ AI limits checked"))
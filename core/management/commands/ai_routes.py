@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from core.services.ai_router import ROUTES
+from core.services.metrics import get_totals
+
+MODELS = ("small", "large")
+COUNTERS = ("calls", "errors", "fallbacks", "short", "ms")
+
+
+class Command(BaseCommand):
+    help = "Show per-route model latency, fallback and quality counters"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=1)
+
+    def handle(self, *args, **options):
+        names = [
+            f"ai_route.{route}.{model}.{counter}"
+            for route in ROUTES
+            for model in MODELS
+            for counter in COUNTERS
+        ]
+        totals = get_totals(names, options["days"])
+
+        self.stdout.write(f"{'route':<8} {'model':<6} {'calls':>6} {'errors':>6} {'fallbk':>6} {'short':>6} {'avg ms':>7}")
+
+        for route in ROUTES:
+            for model in MODELS:
+                prefix = f"ai_route.{route}.{model}"
+                calls = totals[f"{prefix}.calls"]
+                if not calls:
+                    continue
+
+                self.stdout.write(
+                    f"{route:<8} {model:<6} {calls:>6} "
+                    f"{totals[f'{prefix}.errors']:>6} "
+                    f"{totals[f'{prefix}.fallbacks']:>6} "
+                    f"{totals[f'{prefix}.short']:>6} "
+                    f"{totals[f'{prefix}.ms'] // calls:>7}"
+                )
+
+        self.stdout.write(self.style.SUCCESS("✅ AI routes checked"))
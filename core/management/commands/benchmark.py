@@ -0,0 +1,132 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.models import StudySession, UserStats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Benchmark background jobs on synthetic data (everything is rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", choices=["leaderboard", "streaks"])
+        parser.add_argument("--users", type=int, default=100_000)
+        parser.add_argument("--sessions", type=int, default=1_000_000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        handler = getattr(self, f"bench_{options['target']}")
+
+        with transaction.atomic():
+            handler(options)
+            transaction.set_rollback(True)
+
+    # -------------------------------------------------
+    # HELPERS
+    # -------------------------------------------------
+
+    def timed(self, label, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stdout.write(f"{label:<40} {elapsed:>10.1f} ms")
+        return result
+
+    def create_users(self, count):
+        first_id = (User.objects.aggregate(m=Max("id"))["m"] or 0) + 1
+        prefix = f"bench{timezone.now():%H%M%S}_"
+
+        User.objects.bulk_create(
+            [User(username=f"{prefix}{i}", password="!") for i in range(count)],
+            batch_size=5000,
+        )
+
+        ids = list(
+            User.objects
+            .filter(id__gte=first_id, username__startswith=prefix)
+            .values_list("id", flat=True)
+        )
+        if len(ids) != count:
+            raise CommandError("Could not create synthetic users")
+        return ids
+
+    # -------------------------------------------------
+    # TARGETS
+    # -------------------------------------------------
+
+    def bench_leaderboard(self, options):
+        from core.services.leaderboard import (
+            get_rank_context, leaderboard_queryset, rebuild_leaderboard, refresh_leaderboard,
+        )
+        from core.services.xp import commit_platform_xp
+
+        users = options["users"]
+        ids = self.timed(f"create {users} users", self.create_users, users)
+
+        def create_stats():
+            stats = []
+            for uid in ids:
+                xp = random.randint(0, 50_000)
+                stats.append(UserStats(user_id=uid, leetcode_xp=xp, total_xp=xp, level=max(1, xp // 100)))
+            UserStats.objects.bulk_create(stats, batch_size=5000)
+
+        self.timed("create stats", create_stats)
+
+        sample = random.sample(ids, min(200, users))
+
+        self.timed("full rebuild (window query)", rebuild_leaderboard)
+
+        def sync_sample():
+            for uid in sample:
+                commit_platform_xp(User(id=uid), "github", random.randint(0, 500))
+
+        self.timed(f"commit {len(sample)} syncs", sync_sample)
+        self.timed(f"incremental refresh ({len(sample)} moved)", refresh_leaderboard)
+
+        me = User(id=random.choice(ids))
+        self.timed("rank + neighbours lookup", get_rank_context, me)
+        self.timed("page 1 (50 rows)", lambda: list(leaderboard_queryset()[:50]))
+        offset = users * 9 // 10
+        self.timed(f"deep page (offset {offset})", lambda: list(leaderboard_queryset()[offset:offset + 50]))
+
+    def bench_streaks(self, options):
+        from core.services.streaks import compute_streaks, recompute_streaks
+
+        users = min(options["users"], options["sessions"])
+        sessions = options["sessions"]
+        ids = self.timed(f"create {users} users", self.create_users, users)
+
+        today = timezone.localdate()
+        per_user = sessions // users
+
+        def create_sessions():
+            batch = []
+            for uid in ids:
+                # a random walk of active days over the last two years
+                day = today - timedelta(days=random.randint(0, 730))
+                for _ in range(per_user):
+                    batch.append(StudySession(user_id=uid, duration_minutes=30, study_date=day))
+                    day += timedelta(days=random.choice((1, 1, 1, 2, 5)))
+
+                if len(batch) >= 50_000:
+                    StudySession.objects.bulk_create(batch, batch_size=5000)
+                    batch = []
+
+            StudySession.objects.bulk_create(batch, batch_size=5000)
+
+        self.timed(f"create {per_user * users} sessions", create_sessions)
+
+        results = self.timed("gaps-and-islands query", compute_streaks)
+        self.stdout.write(f"users with streak data: {len(results)}")
+
+        self.timed("recompute + bulk_update (first run)", recompute_streaks)
+        self.timed("recompute + bulk_update (no changes)", recompute_streaks)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.services.ai_topics import extract_pending_goal_topics
+
+
+class Command(BaseCommand):
+    help = "Extract study topics for learning goals without a subject, in batched Groq calls"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit",
+            type=int,
+            help="Only process this many distinct goal titles",
+        )
+
+    def handle(self, *args, **options):
+        linked, requests_made = extract_pending_goal_topics(options["limit"])
+
+        self.stdout.write(f"Groq requests: {requests_made}")
+        self.stdout.write(f"Goals linked to subjects: {linked}")
+        self.stdout.write(self.style.SUCCESS("✅ Goal topics extracted"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from core.services.pregenerate import popular_goals, pregenerate_roadmaps, uncached
+
+
+class Command(BaseCommand):
+    help = "Generate and cache AI roadmaps for the most frequent goal titles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=100, help="Most frequent titles to consider")
+        parser.add_argument("--min-count", type=int, default=2, help="Minimum goals per normalized title")
+        parser.add_argument("--concurrency", type=int, default=3, help="Groq requests in flight")
+        parser.add_argument("--per-minute", type=int, default=30, help="Request starts per minute")
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Regenerate titles that are already cached",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Only list what would be generated")
+
+    def handle(self, *args, **options):
+        goals = popular_goals(options["min_count"], options["limit"])
+        todo = goals if options["refresh"] else uncached(goals)
+
+        self.stdout.write(f"Popular titles: {len(goals)}, to generate: {len(todo)}")
+
+        if options["dry_run"]:
+            for _, title, count in todo:
+                self.stdout.write(f"  {count:>5}  {title}")
+            return
+
+        stored, failed = pregenerate_roadmaps(
+            todo,
+            concurrency=options["concurrency"],
+            per_minute=options["per_minute"],
+            log=self.stdout.write,
+        )
+
+        self.stdout.write(f"Stored: {stored}, failed: {failed}")
+        self.stdout.write(self.style.SUCCESS("✅ Roadmaps pre-generated"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core.services.ai_jobs import needs_help_backlog, presolve_tasks
+
+
+class Command(BaseCommand):
+    help = "Generate AI help for tasks flagged needs_help, nearest deadline first"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=200, help="Tasks to process this run")
+        parser.add_argument("--concurrency", type=int, default=3, help="Groq requests in flight")
+        parser.add_argument("--per-minute", type=int, default=20, help="Request starts per minute")
+        parser.add_argument("--dry-run", action="store_true", help="Only list what would be solved")
+
+    def handle(self, *args, **options):
+        tasks = list(needs_help_backlog(options["limit"]))
+
+        self.stdout.write(f"Tasks needing help: {len(tasks)}")
+
+        if options["dry_run"]:
+            for task in tasks:
+                self.stdout.write(f"  {str(task.deadline or '-'):>10}  {task.title}")
+            return
+
+        solved, failed, skipped = presolve_tasks(
+            tasks,
+            concurrency=options["concurrency"],
+            per_minute=options["per_minute"],
+            log=self.stdout.write,
+        )
+
+        self.stdout.write(f"Solved: {solved}, failed: {failed}, skipped: {skipped}")
+        self.stdout.write(self.style.SUCCESS("✅ Task help pre-solved"))
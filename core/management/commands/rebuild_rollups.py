@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.services.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute weekly/monthly leaderboard rollups from DailyActivity and StudySession"
+
+    def handle(self, *args, **options):
+        count = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"✅ Rollups rebuilt ({count} rows)"))
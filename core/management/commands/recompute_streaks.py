@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.services.streaks import recompute_streaks
+
+
+class Command(BaseCommand):
+    help = "Recompute current and longest streaks for all users from the activity log (run nightly)"
+
+    def handle(self, *args, **options):
+        streaks, stats = recompute_streaks()
+        self.stdout.write(f"StudyStreak rows written: {streaks}")
+        self.stdout.write(f"UserStats rows written: {stats}")
+        self.stdout.write(self.style.SUCCESS("✅ Streaks recomputed"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from core.services.metrics import get_totals
+from core.services.roadmap_cache import hit_rate, purge_expired
+
+PREFETCH_METRICS = ["started", "cached", "capped", "hit", "late"]
+
+
+class Command(BaseCommand):
+    help = "Show roadmap cache hit rate (and drop expired entries with --purge)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7)
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Delete roadmaps older than the cache TTL",
+        )
+
+    def handle(self, *args, **options):
+        stats = hit_rate(options["days"])
+
+        self.stdout.write(
+            f"Lookups: {stats['lookups']} "
+            f"(memory hits {stats['roadmap_cache.hit.memory']}, "
+            f"db hits {stats['roadmap_cache.hit.db']}, "
+            f"similar hits {stats['roadmap_cache.hit.similar']}, "
+            f"misses {stats['roadmap_cache.miss']})"
+        )
+        self.stdout.write(f"Hit rate: {stats['hit_rate']:.1%}")
+
+        prefetch = get_totals([f"roadmap_prefetch.{name}" for name in PREFETCH_METRICS], options["days"])
+        self.stdout.write("Prefetch: " + ", ".join(
+            f"{name} {prefetch[f'roadmap_prefetch.{name}']}" for name in PREFETCH_METRICS
+        ))
+
+        if options["purge"]:
+            self.stdout.write(f"Expired roadmaps deleted: {purge_expired()}")
+
+        self.stdout.write(self.style.SUCCESS("✅ Roadmap cache checked"))
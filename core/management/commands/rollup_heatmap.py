@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from core.services.heatmap import rollup_heatmap
+
+
+class Command(BaseCommand):
+    help = "Merge platform activity, study sessions and task completions into UserHeatmap"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignore the watermark and recompute every day",
+        )
+
+    def handle(self, *args, **options):
+        written = rollup_heatmap(full=options["full"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Heatmap rows written: {written}"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.services.resources import catalog_files, catalog_hash, ensure_catalog_seeded
+
+
+class Command(BaseCommand):
+    help = "Seed the built-in subject/resource catalog once per catalog version"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Seed even if this version is recorded")
+
+    def handle(self, *args, **options):
+        seeded = ensure_catalog_seeded(force=options["force"])
+
+        self.stdout.write(f"Catalog {catalog_hash()[:12]}: {len(catalog_files())} subjects")
+        if not seeded:
+            self.stdout.write("Already seeded, nothing to do")
+
+        self.stdout.write(self.style.SUCCESS("✅ Catalog seeded"))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.services.leaderboard import rebuild_leaderboard, refresh_leaderboard
+
+
+class Command(BaseCommand):
+    help = "Reposition users whose XP changed since the last run (or rebuild all ranks with --full)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every rank with the window-function query",
+        )
+
+    def handle(self, *args, **options):
+        if options["full"]:
+            count = rebuild_leaderboard()
+            self.stdout.write(f"Ranked users: {count}")
+        else:
+            count = refresh_leaderboard()
+            self.stdout.write(f"Users repositioned: {count}")
+
+        self.stdout.write(self.style.SUCCESS("✅ Leaderboard updated"))
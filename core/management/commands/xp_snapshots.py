@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.services.xp_history import downsample_snapshots, snapshot_all_users
+
+
+class Command(BaseCommand):
+    help = "Record today's XP snapshot for every user and downsample old history (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip-downsample",
+            action="store_true",
+            help="Only write today's snapshots",
+        )
+
+    def handle(self, *args, **options):
+        written = snapshot_all_users()
+        self.stdout.write(f"Snapshots written: {written}")
+
+        if not options["skip_downsample"]:
+            deleted = downsample_snapshots()
+            self.stdout.write(f"Old daily snapshots folded into weekly: {deleted}")
+
+        self.stdout.write(self.style.SUCCESS("✅ XP snapshots updated"))
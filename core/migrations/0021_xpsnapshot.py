@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_userstats_github_repos'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XPSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('github_xp', models.PositiveIntegerField(default=0)),
+                ('leetcode_xp', models.PositiveIntegerField(default=0)),
+                ('gfg_xp', models.PositiveIntegerField(default=0)),
+                ('codeforces_xp', models.PositiveIntegerField(default=0)),
+                ('hackerrank_xp', models.PositiveIntegerField(default=0)),
+                ('total_xp', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='xp_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_heatmap_change_tracking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learninggoal',
+            name='ai_requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='learninggoal',
+            name='ai_status',
+            field=models.CharField(choices=[('idle', 'Idle'), ('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='idle', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='ai_requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='ai_status',
+            field=models.CharField(choices=[('idle', 'Idle'), ('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='idle', max_length=10),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_ai_generation_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoadmapCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=40, unique=True)),
+                ('normalized_title', models.CharField(max_length=255)),
+                ('title', models.CharField(max_length=200)),
+                ('content', models.TextField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MetricCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('date', models.DateField()),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date', 'name'],
+                'unique_together': {('name', 'date')},
+            },
+        ),
+    ]
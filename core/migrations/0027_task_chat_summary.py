@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_roadmap_cache_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='chat_summary',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='chat_summary_upto',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
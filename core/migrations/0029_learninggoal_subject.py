@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_ai_usage_daily'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learninggoal',
+            name='subject',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='goals', to='core.subject'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_learninggoal_subject'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='learninggoal',
+            name='ai_prefetched',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 6.0.1 on 2026-10-19 08:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# SQLite FTS5 index over TaskMaterialChunk.content, kept in sync by triggers.
+# task_id is indexed too, so a search can be limited to one task in the MATCH.
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE core_taskmaterialchunk_fts USING fts5(
+        content, task_id,
+        content='core_taskmaterialchunk', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER core_taskmaterialchunk_fts_ai AFTER INSERT ON core_taskmaterialchunk BEGIN
+        INSERT INTO core_taskmaterialchunk_fts(rowid, content, task_id)
+        VALUES (new.id, new.content, new.task_id);
+    END
+    """,
+    """
+    CREATE TRIGGER core_taskmaterialchunk_fts_ad AFTER DELETE ON core_taskmaterialchunk BEGIN
+        INSERT INTO core_taskmaterialchunk_fts(core_taskmaterialchunk_fts, rowid, content, task_id)
+        VALUES ('delete', old.id, old.content, old.task_id);
+    END
+    """,
+    """
+    CREATE TRIGGER core_taskmaterialchunk_fts_au AFTER UPDATE ON core_taskmaterialchunk BEGIN
+        INSERT INTO core_taskmaterialchunk_fts(core_taskmaterialchunk_fts, rowid, content, task_id)
+        VALUES ('delete', old.id, old.content, old.task_id);
+        INSERT INTO core_taskmaterialchunk_fts(rowid, content, task_id)
+        VALUES (new.id, new.content, new.task_id);
+    END
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS core_taskmaterialchunk_fts_au",
+    "DROP TRIGGER IF EXISTS core_taskmaterialchunk_fts_ad",
+    "DROP TRIGGER IF EXISTS core_taskmaterialchunk_fts_ai",
+    "DROP TABLE IF EXISTS core_taskmaterialchunk_fts",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_ai_quota_slots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='material_indexed',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='TaskMaterialChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('content', models.TextField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='material_chunks', to='core.task')),
+            ],
+            options={
+                'ordering': ['task', 'position'],
+            },
+        ),
+        migrations.RunPython(_run(FTS_SQL), _run(DROP_SQL)),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_task_material_chunks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskmessage',
+            name='client_token',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='taskmessage',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_token', ''), _negated=True), fields=('task', 'sender', 'client_token'), name='taskmessage_client_token_unique'),
+        ),
+    ]
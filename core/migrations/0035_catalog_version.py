@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:45
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def drop_duplicate_resources(apps, schema_editor):
+    # keep the oldest row per (topic, title) so the constraint can be added
+    Resource = apps.get_model("core", "Resource")
+
+    keep = (
+        Resource.objects
+        .values("topic_id", "title")
+        .annotate(keep_id=Min("id"))
+        .values_list("keep_id", flat=True)
+    )
+    Resource.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_taskmessage_client_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('seeded_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(drop_duplicate_resources, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='resource',
+            constraint=models.UniqueConstraint(fields=('topic', 'title'), name='resource_topic_title_unique'),
+        ),
+    ]
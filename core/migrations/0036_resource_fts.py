@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:30
+
+from django.db import migrations
+
+# SQLite FTS5 index of resources with their topic and subject names;
+# rowid = Resource.id. Kept in sync by core.signals.
+FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE core_resource_fts USING fts5(
+        title, description, topic, subject,
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    INSERT INTO core_resource_fts(rowid, title, description, topic, subject)
+    SELECT r.id, r.title, r.short_description, t.name, s.name
+    FROM core_resource r
+    JOIN core_topic t ON t.id = r.topic_id
+    JOIN core_subject s ON s.id = t.subject_id
+    """,
+]
+
+DROP_SQL = [
+    "DROP TABLE IF EXISTS core_resource_fts",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0035_catalog_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FTS_SQL), _run(DROP_SQL)),
+    ]
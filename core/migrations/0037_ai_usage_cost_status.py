@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0036_resource_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiusagedaily',
+            name='client_errors',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aiusagedaily',
+            name='cost',
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='aiusagedaily',
+            name='rate_limited',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aiusagedaily',
+            name='server_errors',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aiusagedaily',
+            name='shed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='aiusagedaily',
+            name='timeouts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
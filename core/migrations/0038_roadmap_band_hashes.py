@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0037_ai_usage_cost_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roadmapcache',
+            name='band_hashes',
+            field=models.BinaryField(null=True),
+        ),
+    ]
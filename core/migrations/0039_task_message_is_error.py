@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0038_roadmap_band_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskmessage',
+            name='is_error',
+            field=models.BooleanField(default=False),
+        ),
+    ]
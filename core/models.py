@@ -4,6 +4,14 @@ from django.utils import timezone
 
 User = settings.AUTH_USER_MODEL
 
+# state of a background AI generation (task help, goal roadmap)
+AI_STATUS = [
+    ("idle", "Idle"),
+    ("pending", "Pending"),
+    ("ready", "Ready"),
+    ("failed", "Failed"),
+]
+
 
 # ==================================================
 #                ACADEMIC STRUCTURE
@@ -77,6 +85,9 @@ class Resource(models.Model):
 
     class Meta:
         ordering = ["title"]
+        constraints = [
+            models.UniqueConstraint(fields=["topic", "title"], name="resource_topic_title_unique"),
+        ]
 
     def __str__(self):
         return self.title
@@ -152,9 +163,19 @@ class Task(models.Model):
     estimated_hours = models.DecimalField(max_digits=4, decimal_places=1, null=True, blank=True)
 
     completed = models.BooleanField(default=False)
+    completed_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     needs_help = models.BooleanField(default=False)
     ai_solution = models.TextField(blank=True)
+    ai_status = models.CharField(max_length=10, choices=AI_STATUS, default="idle")
+    ai_requested_at = models.DateTimeField(null=True, blank=True)
+
+    # rolling summary of chat messages up to and including this message id
+    chat_summary = models.TextField(blank=True)
+    chat_summary_upto = models.BigIntegerField(default=0)
+
+    # material text has been chunked into TaskMaterialChunk
+    material_indexed = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -175,15 +196,45 @@ class TaskMessage(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="messages")
     sender = models.CharField(max_length=10, choices=SENDER)
     content = models.TextField()
+
+    # idempotency key sent by the chat form; the AI reply carries the same one
+    client_token = models.CharField(max_length=64, blank=True)
+
+    # AI replies that failed upstream: shown, but kept out of the chat context
+    is_error = models.BooleanField(default=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task", "sender", "client_token"],
+                condition=~models.Q(client_token=""),
+                name="taskmessage_client_token_unique",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.task.title} - {self.sender}"
 
 
+class TaskMaterialChunk(models.Model):
+    """
+    A passage of the task's uploaded material. Mirrored into the
+    core_taskmaterialchunk_fts (SQLite FTS5) table by triggers.
+    """
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="material_chunks")
+    position = models.PositiveIntegerField()
+    content = models.TextField()
+
+    class Meta:
+        ordering = ["task", "position"]
+
+    def __str__(self):
+        return f"{self.task.title} #{self.position}"
+
+
 # ==================================================
 #                     NOTES
 # ==================================================
@@ -227,7 +278,21 @@ class LearningGoal(models.Model):
 
     status = models.CharField(max_length=15, choices=STATUS, default="planned")
 
+    # set once its topics have been extracted (see ai_topics)
+    subject = models.ForeignKey(
+        Subject,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="goals"
+    )
+
     ai_solution = models.TextField(blank=True)
+    ai_status = models.CharField(max_length=10, choices=AI_STATUS, default="idle")
+    ai_requested_at = models.DateTimeField(null=True, blank=True)
+    # generation was started at creation time and the page wasn't opened yet
+    ai_prefetched = models.BooleanField(default=False)
+
     is_satisfied = models.BooleanField(null=True, blank=True)
     satisfaction_note = models.TextField(blank=True)
 
@@ -251,6 +316,7 @@ class StudySession(models.Model):
 
     duration_minutes = models.PositiveIntegerField()
     study_date = models.DateField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
 
     class Meta:
         ordering = ["-study_date"]
@@ -312,6 +378,8 @@ class DailyActivity(models.Model):
     hours_spent = models.DecimalField(max_digits=4, decimal_places=2, default=0)
     xp = models.PositiveIntegerField(default=0)
 
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     class Meta:
         unique_together = ("account", "date")
         ordering = ["-date"]
@@ -375,6 +443,11 @@ class UserStats(models.Model):
 
     last_updated = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["last_updated"], name="userstats_updated_idx"),
+        ]
+
     def recalculate_totals(self):
         self.total_xp = (
             self.github_xp
@@ -390,6 +463,25 @@ class UserStats(models.Model):
         return f"{self.user} - {self.total_xp} XP"
 
 
+class XPSnapshot(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="xp_snapshots")
+    date = models.DateField()
+
+    github_xp = models.PositiveIntegerField(default=0)
+    leetcode_xp = models.PositiveIntegerField(default=0)
+    gfg_xp = models.PositiveIntegerField(default=0)
+    codeforces_xp = models.PositiveIntegerField(default=0)
+    hackerrank_xp = models.PositiveIntegerField(default=0)
+    total_xp = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "date")
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.user} - {self.date} ({self.total_xp} XP)"
+
+
 class LeaderboardEntry(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="leaderboard_entries")
     xp = models.PositiveIntegerField()
@@ -398,7 +490,180 @@ class LeaderboardEntry(models.Model):
 
     class Meta:
         ordering = ["rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["user"], name="leaderboard_unique_user"),
+        ]
+        indexes = [
+            models.Index(fields=["xp", "user"], name="leaderboard_xp_user_idx"),
+        ]
 
     def __str__(self):
         return f"{self.rank}. {self.user}"
-    
\ No newline at end of file
+
+
+class LeaderboardRollup(models.Model):
+    WINDOWS = [
+        ("week", "Weekly"),
+        ("month", "Monthly"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="leaderboard_rollups")
+    window = models.CharField(max_length=10, choices=WINDOWS)
+    period_start = models.DateField()
+
+    # "all", "platform:<slug>" or "track:<id>"
+    board = models.CharField(max_length=60)
+    score = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("window", "period_start", "board", "user")
+        indexes = [
+            models.Index(
+                fields=["window", "period_start", "board", "-score", "user"],
+                name="rollup_board_score_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.board} {self.window} {self.period_start} ({self.score})"
+
+
+# ==================================================
+#                BACKGROUND JOBS
+# ==================================================
+
+class JobWatermark(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
+
+
+class CatalogVersion(models.Model):
+    """
+    Content hash of the last seeded version of a built-in catalog.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    content_hash = models.CharField(max_length=64)
+    seeded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.content_hash[:12]}"
+
+
+# ==================================================
+#                AI CACHES & METRICS
+# ==================================================
+
+class RoadmapCache(models.Model):
+    """
+    Cross-user AI roadmaps keyed by the normalized goal title.
+    """
+    key = models.CharField(max_length=40, unique=True)
+    normalized_title = models.CharField(max_length=255)
+    title = models.CharField(max_length=200)
+
+    # MinHash/LSH band hashes of normalized_title (see goal_index)
+    band_hashes = models.BinaryField(null=True)
+
+    content = models.TextField()
+    hits = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return self.normalized_title
+
+
+class MetricCounter(models.Model):
+    name = models.CharField(max_length=100)
+    date = models.DateField()
+    value = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("name", "date")
+        ordering = ["-date", "name"]
+
+    def __str__(self):
+        return f"{self.name} {self.date}: {self.value}"
+
+
+class AIUsageDaily(models.Model):
+    """
+    Groq traffic per user, day, feature and model. One row is bumped per
+    call; averages are total_ms / calls etc.
+    """
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="ai_usage")
+    date = models.DateField()
+    feature = models.CharField(max_length=40)
+    model = models.CharField(max_length=80)
+
+    calls = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+
+    # errors by status class (the rest are unexpected responses)
+    rate_limited = models.PositiveIntegerField(default=0)
+    client_errors = models.PositiveIntegerField(default=0)
+    server_errors = models.PositiveIntegerField(default=0)
+    timeouts = models.PositiveIntegerField(default=0)
+    shed = models.PositiveIntegerField(default=0)
+
+    prompt_tokens = models.PositiveBigIntegerField(default=0)
+    completion_tokens = models.PositiveBigIntegerField(default=0)
+
+    # USD at the model's price when the call was made
+    cost = models.DecimalField(max_digits=12, decimal_places=6, default=0)
+
+    total_ms = models.PositiveBigIntegerField(default=0)
+    ttfb_ms = models.PositiveBigIntegerField(default=0)
+    max_ms = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "date", "feature", "model")
+        indexes = [
+            models.Index(fields=["date", "feature"], name="aiusage_date_feature_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.date} {self.feature}: {self.calls}"
+
+
+class AIInflight(models.Model):
+    """
+    Cross-process single-flight lease for identical Groq prompts.
+    The owner writes `result`; other workers wait for it.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    started_at = models.DateTimeField(default=timezone.now, db_index=True)
+    result = models.TextField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.key
+
+
+class AIQuota(models.Model):
+    """
+    Per-user token bucket for AI requests (see ai_limits).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="ai_quota")
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user} ({self.tokens:.1f})"
+
+
+class AISlot(models.Model):
+    """
+    One row per allowed concurrent Groq call across all processes.
+    A slot is free once leased_until has passed.
+    """
+    token = models.CharField(max_length=32, blank=True)
+    leased_until = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"slot {self.pk} until {self.leased_until}"
@@ -0,0 +1,338 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import LearningGoal, Task, TaskMessage
+from core.services.background import run_in_background
+from core.services.groq import is_ai_error, rate_limit_cooldown
+from core.services.metrics import incr
+from core.services.pregenerate import MAX_ATTEMPTS, Pacer
+from core.services.roadmap_cache import cached_goal_solution, get_cached_roadmap
+from core.services.task_ai import generate_task_reply
+from core.services.task_material import ensure_material_indexed, index_task_material
+
+# -------------------------------------------------
+# AI JOB CONFIG
+# -------------------------------------------------
+
+# a pending job older than this was lost (worker restart) and may be retried;
+# must stay above the 60s Groq timeout
+STALE_AFTER = timedelta(minutes=3)
+
+# a replayed chat submission waits this long for the original reply
+# (covers the small model timeout plus a large model fallback)
+REPLAY_WAIT = 90
+REPLAY_POLL = 0.5
+
+# speculative roadmap generation for new goals: at most this many in
+# flight per process (leaving pool threads for real clicks) and this
+# many starts per minute
+PREFETCH_MAX_INFLIGHT = getattr(settings, "ROADMAP_PREFETCH_INFLIGHT", 2)
+PREFETCH_PER_MINUTE = getattr(settings, "ROADMAP_PREFETCH_PER_MINUTE", 20)
+
+_prefetch_lock = threading.Lock()
+_prefetch_inflight = 0
+_prefetch_starts = deque()
+
+
+def _claim(queryset, pk):
+    """
+    Marks the row pending unless a fresh job already owns it. The
+    conditional UPDATE makes the claim atomic across web workers.
+    """
+    now = timezone.now()
+    fresh = Q(ai_status="pending", ai_requested_at__gt=now - STALE_AFTER)
+
+    return queryset.filter(pk=pk).exclude(fresh).update(
+        ai_status="pending",
+        ai_requested_at=now,
+    ) == 1
+
+
+# -------------------------------------------------
+# TASK HELP
+# -------------------------------------------------
+
+def store_task_reply(task, ai_reply, client_token="", error=False):
+    """
+    Saves the AI message. An `error` reply is still shown (and found by
+    replays) but does not count as the task's solution.
+    """
+    message = TaskMessage.objects.create(
+        task=task, sender="ai", content=ai_reply, client_token=client_token, is_error=error
+    )
+    if not error:
+        task.ai_solution = ai_reply
+        task.needs_help = False
+        task.save(update_fields=["ai_solution", "needs_help"])
+    return message
+
+
+def is_replay(task, client_token):
+    """
+    True if a chat submission with this idempotency token was already
+    accepted (double submit, browser retry). Replays never call the model.
+    """
+    if not client_token:
+        return False
+
+    replayed = TaskMessage.objects.filter(task=task, sender="user", client_token=client_token).exists()
+    if replayed:
+        incr("task_chat.replayed")
+    return replayed
+
+
+def wait_for_task_reply(task, client_token, timeout=REPLAY_WAIT):
+    """
+    The AI message answering the submission with this token, waiting
+    for the original request to finish it. None on timeout.
+    """
+    deadline = time.monotonic() + timeout
+
+    while True:
+        message = TaskMessage.objects.filter(task=task, sender="ai", client_token=client_token).first()
+        if message or time.monotonic() >= deadline:
+            return message
+        time.sleep(REPLAY_POLL)
+
+
+def task_help_prompt(task):
+    return f"""
+User needs help with this task.
+
+Title: {task.title}
+Subject: {task.custom_subject or task.subject}
+Type: {task.task_type}
+"""
+
+
+def help_pending(task):
+    """
+    True while a fresh help job owns the task.
+    """
+    return (
+        task.ai_status == "pending"
+        and task.ai_requested_at is not None
+        and task.ai_requested_at > timezone.now() - STALE_AFTER
+    )
+
+
+def request_task_help(task, prompt):
+    """
+    Queues an AI reply for the task and returns immediately.
+    The page polls task_ai_status until ai_status leaves "pending".
+    """
+    if _claim(Task.objects, task.pk):
+        run_in_background(f"task-help:{task.pk}", generate_task_help, task.pk, prompt)
+
+
+def request_material_index(task):
+    """
+    Chunks and indexes newly uploaded material off the request thread.
+    """
+    if task.material:
+        run_in_background(f"task-material:{task.pk}", index_task_material, task.pk)
+
+
+def generate_task_help(task_id, prompt):
+    """
+    Error replies are not stored: the task goes to "failed" and keeps
+    needs_help, so the student can ask again and presolve_tasks retries.
+    """
+    tasks = Task.objects.filter(pk=task_id)
+
+    try:
+        task = tasks.select_related("subject").get()
+
+        # help is usually asked right after upload; ground it in the material
+        ensure_material_indexed(task)
+
+        ai_reply = generate_task_reply(task, prompt, feature="task_help", lead=True)
+    except Exception:
+        ai_reply = ""
+
+    if is_ai_error(ai_reply):
+        tasks.update(ai_status="failed")
+        return
+
+    store_task_reply(task, ai_reply)
+    tasks.update(ai_status="ready")
+
+
+# -------------------------------------------------
+# GOAL ROADMAP
+# -------------------------------------------------
+
+def request_goal_roadmap(goal):
+    """
+    A roadmap cached for an equivalent goal title is copied in at once;
+    otherwise one is generated in the background.
+    """
+    cached = get_cached_roadmap(goal.title)
+    if cached is not None:
+        LearningGoal.objects.filter(pk=goal.pk).update(ai_solution=cached, ai_status="ready")
+        return
+
+    if _claim(LearningGoal.objects, goal.pk):
+        run_in_background(f"goal-roadmap:{goal.pk}", generate_goal_roadmap, goal.pk)
+
+
+def generate_goal_roadmap(goal_id):
+    """
+    Error replies are not stored, so the next visit asks again.
+    """
+    goal = LearningGoal.objects.get(pk=goal_id)
+
+    try:
+        solution = cached_goal_solution(goal.title, user=goal.user_id)
+    except Exception:
+        solution = ""
+
+    goals = LearningGoal.objects.filter(pk=goal_id)
+
+    if is_ai_error(solution):
+        goals.update(ai_status="failed")
+    else:
+        goals.update(ai_solution=solution, ai_status="ready")
+
+
+# -------------------------------------------------
+# GOAL ROADMAP PREFETCH
+# -------------------------------------------------
+
+def _take_prefetch_slot():
+    global _prefetch_inflight
+
+    with _prefetch_lock:
+        now = time.monotonic()
+        while _prefetch_starts and now - _prefetch_starts[0] > 60:
+            _prefetch_starts.popleft()
+
+        if (_prefetch_inflight >= PREFETCH_MAX_INFLIGHT
+                or len(_prefetch_starts) >= PREFETCH_PER_MINUTE):
+            return False
+
+        _prefetch_inflight += 1
+        _prefetch_starts.append(now)
+        return True
+
+
+def _release_prefetch_slot(_future=None):
+    global _prefetch_inflight
+
+    with _prefetch_lock:
+        _prefetch_inflight -= 1
+
+
+def prefetch_goal_roadmap(goal):
+    """
+    Starts the roadmap of a just-created goal so it is usually ready
+    when start_learning is opened. Skipped (and counted) when over the
+    prefetch caps; the click then generates it as before.
+    """
+    goals = LearningGoal.objects.filter(pk=goal.pk)
+
+    cached = get_cached_roadmap(goal.title)
+    if cached is not None:
+        goals.update(ai_solution=cached, ai_status="ready", ai_prefetched=True)
+        incr("roadmap_prefetch.cached")
+        return
+
+    if not _take_prefetch_slot():
+        incr("roadmap_prefetch.capped")
+        return
+
+    if not _claim(LearningGoal.objects, goal.pk):
+        _release_prefetch_slot()
+        return
+
+    goals.update(ai_prefetched=True)
+    incr("roadmap_prefetch.started")
+
+    future = run_in_background(f"goal-roadmap:{goal.pk}", generate_goal_roadmap, goal.pk)
+    future.add_done_callback(_release_prefetch_slot)
+
+
+def note_goal_opened(goal):
+    """
+    Counts, once per goal, whether the prefetch beat the user's click.
+    """
+    if not goal.ai_prefetched:
+        return
+
+    if LearningGoal.objects.filter(pk=goal.pk, ai_prefetched=True).update(ai_prefetched=False):
+        incr("roadmap_prefetch.hit" if goal.ai_solution else "roadmap_prefetch.late")
+
+
+# -------------------------------------------------
+# BATCH PRE-SOLVE (needs_help BACKLOG)
+# -------------------------------------------------
+
+def needs_help_backlog(limit=None):
+    """
+    Open tasks flagged needs_help, nearest deadline first
+    (no deadline last, then oldest).
+    """
+    tasks = (
+        Task.objects
+        .filter(needs_help=True, completed=False)
+        .select_related("subject")
+        .order_by(F("deadline").asc(nulls_last=True), "created_at")
+    )
+    return tasks[:limit] if limit else tasks
+
+
+def presolve_tasks(tasks, concurrency=3, per_minute=20, log=print):
+    """
+    Generates help for each task like task_need_help would, with at most
+    `concurrency` requests in flight and starts paced to `per_minute`.
+    Tasks a user is already waiting on are skipped. Failed tasks keep
+    needs_help and are retried by the next run.
+
+    Returns (solved, failed, skipped).
+    """
+    pacer = Pacer(per_minute)
+
+    def solve(task):
+        try:
+            ensure_material_indexed(task)
+            prompt = task_help_prompt(task)
+
+            for attempt in range(MAX_ATTEMPTS):
+                pacer.wait()
+
+                if not _claim(Task.objects, task.pk):
+                    log(f"… {task.title}: already being answered")
+                    return "skipped"
+
+                ai_reply = generate_task_reply(task, prompt, feature="task_presolve", lead=True)
+
+                if not is_ai_error(ai_reply):
+                    store_task_reply(task, ai_reply)
+                    Task.objects.filter(pk=task.pk).update(ai_status="ready")
+                    log(f"✔ {task.title} (due {task.deadline or '-'})")
+                    return "solved"
+
+                # release the claim; errors are not shown to the student
+                Task.objects.filter(pk=task.pk).update(ai_status="idle")
+
+                # retried only when Groq asked us to slow down
+                if not rate_limit_cooldown():
+                    break
+
+            log(f"✘ {task.title}: {ai_reply[:80]}")
+            return "failed"
+        finally:
+            close_old_connections()
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(solve, tasks))
+
+    return results.count("solved"), results.count("failed"), results.count("skipped")
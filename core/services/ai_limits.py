@@ -0,0 +1,197 @@
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from math import ceil
+
+from django.conf import settings
+from django.db.models import Subquery
+from django.utils import timezone
+
+from core.models import AIQuota, AISlot
+from core.services.metrics import incr
+
+# -------------------------------------------------
+# AI LIMITS CONFIG
+# -------------------------------------------------
+
+# per-user token bucket: BURST requests at once, refilled continuously
+USER_BURST = getattr(settings, "AI_USER_BURST", 10)
+USER_REFILL_PER_MINUTE = getattr(settings, "AI_USER_REFILL_PER_MINUTE", 5)
+
+# Groq calls in flight across all worker processes
+MAX_CONCURRENCY = getattr(settings, "AI_MAX_CONCURRENCY", 8)
+
+# how long a call may wait for a free slot before it is shed
+SLOT_WAIT = getattr(settings, "AI_SLOT_WAIT_SECONDS", 2)
+
+# a slot not renewed for this long belongs to a dead worker; calls time
+# out after 60s without a response (or between stream chunks), and
+# streams renew the lease as tokens arrive
+SLOT_LEASE = timedelta(seconds=75)
+SLOT_RENEW_EVERY = 15
+
+POLL_INTERVAL = 0.1
+CAS_ATTEMPTS = 5
+
+_EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class AIBusy(Exception):
+    """
+    Raised when an AI request is shed. `retry_after` is in seconds.
+    """
+
+    def __init__(self, retry_after, reason="busy"):
+        self.retry_after = max(1, int(retry_after))
+        self.reason = reason
+        super().__init__(f"AI is busy right now, please retry in {self.retry_after} seconds.")
+
+
+# -------------------------------------------------
+# PER-USER TOKEN BUCKET
+# -------------------------------------------------
+
+def check_user_quota(user):
+    """
+    Takes one token from the user's bucket or raises AIBusy.
+    The bucket row is updated with compare-and-swap on updated_at,
+    so concurrent requests from several workers never double-spend.
+    """
+    user_id = getattr(user, "pk", user)
+    rate = USER_REFILL_PER_MINUTE / 60
+
+    for _ in range(CAS_ATTEMPTS):
+        now = timezone.now()
+        bucket, created = AIQuota.objects.get_or_create(
+            user_id=user_id,
+            defaults={"tokens": USER_BURST - 1, "updated_at": now},
+        )
+        if created:
+            incr("ai_limits.admitted")
+            return
+
+        elapsed = max(0.0, (now - bucket.updated_at).total_seconds())
+        tokens = min(USER_BURST, bucket.tokens + elapsed * rate)
+
+        if tokens < 1:
+            incr("ai_limits.rejected.quota")
+            raise AIBusy(ceil((1 - tokens) / rate), reason="quota")
+
+        swapped = AIQuota.objects.filter(pk=bucket.pk, updated_at=bucket.updated_at).update(
+            tokens=tokens - 1,
+            updated_at=now,
+        )
+        if swapped:
+            incr("ai_limits.admitted")
+            return
+
+    incr("ai_limits.rejected.contention")
+    raise AIBusy(1)
+
+
+# -------------------------------------------------
+# GLOBAL CONCURRENCY SLOTS
+# -------------------------------------------------
+
+_slots_ready = False
+
+
+def _ensure_slots():
+    global _slots_ready
+
+    if _slots_ready:
+        return
+
+    AISlot.objects.bulk_create(
+        [AISlot(id=i, leased_until=_EPOCH) for i in range(1, MAX_CONCURRENCY + 1)],
+        ignore_conflicts=True,
+    )
+    AISlot.objects.filter(id__gt=MAX_CONCURRENCY).delete()
+    _slots_ready = True
+
+
+def _try_acquire(token):
+    now = timezone.now()
+    free = AISlot.objects.filter(leased_until__lt=now).values("pk")[:1]
+
+    # one conditional UPDATE: two workers can't take the same slot
+    return AISlot.objects.filter(pk__in=Subquery(free), leased_until__lt=now).update(
+        token=token,
+        leased_until=now + SLOT_LEASE,
+    ) == 1
+
+
+def slots_available():
+    _ensure_slots()
+    return AISlot.objects.filter(leased_until__lt=timezone.now()).exists()
+
+
+@contextmanager
+def ai_slot(wait=SLOT_WAIT):
+    """
+    Holds one of the MAX_CONCURRENCY global slots for the duration of a
+    Groq call. Waits up to `wait` seconds, then raises AIBusy.
+    Yields a renew() callable that long calls (streams) invoke as they
+    make progress; it writes at most once per SLOT_RENEW_EVERY seconds.
+    """
+    _ensure_slots()
+
+    token = uuid.uuid4().hex
+    started = time.monotonic()
+
+    queued = False
+
+    while not _try_acquire(token):
+        if time.monotonic() - started >= wait:
+            incr("ai_limits.rejected.busy")
+            raise AIBusy(_next_free_in())
+        queued = True
+        time.sleep(POLL_INTERVAL)
+
+    if queued:
+        incr("ai_limits.queued")
+        incr("ai_limits.queue_ms", int((time.monotonic() - started) * 1000))
+
+    renewed = time.monotonic()
+
+    def renew():
+        nonlocal renewed
+        if time.monotonic() - renewed >= SLOT_RENEW_EVERY:
+            AISlot.objects.filter(token=token).update(leased_until=timezone.now() + SLOT_LEASE)
+            renewed = time.monotonic()
+
+    try:
+        yield renew
+    finally:
+        AISlot.objects.filter(token=token).update(token="", leased_until=_EPOCH)
+
+
+def _next_free_in():
+    soonest = (
+        AISlot.objects
+        .order_by("leased_until")
+        .values_list("leased_until", flat=True)
+        .first()
+    )
+    if soonest is None:
+        return 1
+
+    # leases are an upper bound; calls usually finish far sooner
+    return min(10, (soonest - timezone.now()).total_seconds())
+
+
+# -------------------------------------------------
+# ADMISSION
+# -------------------------------------------------
+
+def admit(user):
+    """
+    Fast pre-check for user-triggered AI requests: the user's quota and
+    a free global slot. Raises AIBusy instead of queueing.
+    """
+    if not slots_available():
+        incr("ai_limits.rejected.busy")
+        raise AIBusy(_next_free_in())
+
+    check_user_quota(user)
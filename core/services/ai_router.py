@@ -0,0 +1,124 @@
+import re
+
+from django.conf import settings
+
+from core.services.metrics import incr
+
+# -------------------------------------------------
+# ROUTER CONFIG
+# -------------------------------------------------
+
+LARGE_MODEL = getattr(settings, "AI_MODEL_LARGE", "llama-3.3-70b-versatile")
+SMALL_MODEL = getattr(settings, "AI_MODEL_SMALL", "llama-3.1-8b-instant")
+
+# per-model request timeout; the small model fails over quickly
+TIMEOUTS = {
+    LARGE_MODEL: 60,
+    SMALL_MODEL: 20,
+}
+
+# route -> model chain, tried in order when a call fails or times out.
+# Roadmaps have no fallback: they are cached for every user with the same
+# goal, so a small-model answer from one bad minute would stick for weeks.
+ROUTES = {
+    "large": [LARGE_MODEL, SMALL_MODEL],
+    "small": [SMALL_MODEL, LARGE_MODEL],
+    "roadmap": [LARGE_MODEL],
+}
+
+# features that always need the large model (without fallback) / never do
+LARGE_FEATURES = {"roadmap", "roadmap_pregen"}
+SMALL_FEATURES = {"topic_extraction", "chat_summary"}
+
+# chat features are classified by the student's message
+CHAT_FEATURES = {"task_chat", "task_help"}
+
+COMPLEX_MESSAGE_CHARS = 400
+COMPLEX_PROMPT_CHARS = 6000
+
+COMPLEX_HINTS = re.compile(
+    r"```|\b(prove|proof|derive|derivation|implement|design|architecture|optimi[sz]e|"
+    r"complexity|algorithm|debug|step[- ]by[- ]step|in detail|essay|compare|analy[sz]e|"
+    r"solve|solution|assignment|project|exam)\b",
+    re.IGNORECASE,
+)
+
+SHORT_REPLY_CHARS = 40
+
+
+# -------------------------------------------------
+# CLASSIFICATION
+# -------------------------------------------------
+
+def choose_route(feature, messages):
+    """
+    "roadmap" (large model only) for roadmaps, "large" for long prompts
+    and complex questions, "small" for summaries, topic lists and quick
+    chat clarifications.
+    """
+    if feature in LARGE_FEATURES:
+        return "roadmap"
+
+    if feature in SMALL_FEATURES:
+        return "small"
+
+    if feature not in CHAT_FEATURES:
+        return "large"
+
+    prompt_chars = sum(len(m.get("content") or "") for m in messages)
+    if prompt_chars > COMPLEX_PROMPT_CHARS:
+        return "large"
+
+    question = next(
+        (m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"),
+        "",
+    )
+    if len(question) > COMPLEX_MESSAGE_CHARS or COMPLEX_HINTS.search(question):
+        return "large"
+
+    return "small"
+
+
+def model_chain(route):
+    return ROUTES[route]
+
+
+def timeout_for(model):
+    return TIMEOUTS.get(model, 60)
+
+
+def longest_chain():
+    """
+    (seconds, hops) of the slowest route when every model times out.
+    """
+    return max(
+        (sum(timeout_for(model) for model in chain), len(chain))
+        for chain in ROUTES.values()
+    )
+
+
+# -------------------------------------------------
+# ROUTE COUNTERS
+# -------------------------------------------------
+
+def _label(model):
+    return "large" if model == LARGE_MODEL else "small" if model == SMALL_MODEL else "other"
+
+
+def record_route(route, model, ok, elapsed_ms, reply_chars=0, fallback=False):
+    """
+    ai_route.<route>.<model size>.{calls,errors,ms,short,fallbacks}.
+    Short replies are a cheap quality signal for the small model.
+    """
+    prefix = f"ai_route.{route}.{_label(model)}"
+
+    incr(f"{prefix}.calls")
+    incr(f"{prefix}.ms", int(elapsed_ms))
+
+    if not ok:
+        incr(f"{prefix}.errors")
+    elif reply_chars < SHORT_REPLY_CHARS:
+        incr(f"{prefix}.short")
+
+    if fallback:
+        incr(f"{prefix}.fallbacks")
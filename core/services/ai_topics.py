@@ -1,48 +1,169 @@
-import requests
+import json
+
 from django.conf import settings
+from django.db import transaction
 
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+from core.models import LearningGoal, LearningTrack, Subject, Topic
+from core.services.groq import call_groq, is_ai_error
+from core.services.roadmap_cache import normalize_goal_title
 
+# -------------------------------------------------
+# TOPIC EXTRACTION CONFIG
+# -------------------------------------------------
+
+# goals per Groq request; ~12 short topics each keeps the reply small
+BATCH_SIZE = 20
+
+# subjects created from goals live under this track
+GOALS_TRACK = getattr(settings, "GOAL_TOPICS_TRACK", "Learning Goals")
+
+MIN_TOPICS = 3
+MAX_TOPICS = 12
 
-def extract_topics(goal_title):
-    api_key = settings.GROQ_API_KEY
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+# -------------------------------------------------
+# EXTRACTION (JSON MODE)
+# -------------------------------------------------
+
+def extract_topics_batch(goal_titles, user=None):
+    """
+    {title: {"subject": str, "topics": [str]}} for up to BATCH_SIZE goals
+    in one JSON-mode request. Titles the model skipped or answered badly
+    are left out.
+    """
+    titles = list(dict.fromkeys(goal_titles))[:BATCH_SIZE]
+    if not titles:
+        return {}
+
+    numbered = "\n".join(f"g{i}: {title}" for i, title in enumerate(titles))
 
     prompt = f"""
 You are an academic syllabus designer.
 
-For the learning goal: "{goal_title}"
+For each learning goal below, give a short subject name (2-4 words) and
+8-{MAX_TOPICS} core study topics. Keep topics short and academic.
 
-Return a clean Python-style list of 8–12 core study topics.
-Keep topics short and academic.
-Do not explain anything.
+Goals:
+{numbered}
 
-Example format:
-["HTML Basics", "CSS Fundamentals", "JavaScript Basics"]
+Reply with JSON only, in this shape:
+{{"results": [{{"id": "g0", "subject": "Web Development", "topics": ["HTML Basics", "CSS Fundamentals"]}}]}}
 """
 
-    payload = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [
-            {"role": "system", "content": "You are an expert curriculum designer."},
-            {"role": "user", "content": prompt}
-        ],
-        "temperature": 0.2
-    }
+    messages = [
+        {"role": "system", "content": "You are an expert curriculum designer. You always answer with valid JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+    text = call_groq(messages, temperature=0.2, feature="topic_extraction", user=user, json_mode=True)
+    if is_ai_error(text):
+        print("Topic extraction error:", text)
+        return {}
 
     try:
-        res = requests.post(GROQ_URL, headers=headers, json=payload, timeout=60)
-        res.raise_for_status()
-        text = res.json()["choices"][0]["message"]["content"]
+        results = json.loads(text).get("results", [])
+    except (ValueError, AttributeError) as e:
+        print("Topic extraction error:", e)
+        return {}
 
-        topics = eval(text)  # AI returns list
-        return [t.strip() for t in topics if len(t.strip()) > 2]
+    extracted = {}
+    for item in results if isinstance(results, list) else []:
+        if not isinstance(item, dict):
+            continue
 
-    except Exception as e:
-        print("Topic extraction error:", e)
-        return []
-    
\ No newline at end of file
+        index = str(item.get("id", "")).lstrip("g")
+        if not index.isdigit() or int(index) >= len(titles):
+            continue
+
+        subject = str(item.get("subject") or "").strip()[:100]
+        topics = [
+            str(t).strip()[:150]
+            for t in item.get("topics") or []
+            if isinstance(t, str) and len(t.strip()) > 2
+        ]
+        topics = list(dict.fromkeys(topics))[:MAX_TOPICS]
+
+        if subject and len(topics) >= MIN_TOPICS:
+            extracted[titles[int(index)]] = {"subject": subject, "topics": topics}
+
+    return extracted
+
+
+def extract_topics(goal_title):
+    result = extract_topics_batch([goal_title]).get(goal_title)
+    return result["topics"] if result else []
+
+
+# -------------------------------------------------
+# MATERIALIZE SUBJECTS / TOPICS
+# -------------------------------------------------
+
+def save_extracted_topics(extracted, goals):
+    """
+    Bulk-creates Subject and Topic rows (existing ones are kept via the
+    unique keys) and links each goal to its subject, in one transaction.
+    `goals` maps title -> [LearningGoal].
+    """
+    if not extracted:
+        return 0
+
+    with transaction.atomic():
+        track, _ = LearningTrack.objects.get_or_create(name=GOALS_TRACK)
+
+        names = {item["subject"] for item in extracted.values()}
+        Subject.objects.bulk_create(
+            [Subject(track=track, name=name) for name in names],
+            ignore_conflicts=True,
+        )
+        subjects = dict(
+            Subject.objects
+            .filter(track=track, name__in=names)
+            .values_list("name", "id")
+        )
+
+        topics = [
+            Topic(subject_id=subjects[item["subject"]], name=name)
+            for item in extracted.values()
+            for name in item["topics"]
+        ]
+        Topic.objects.bulk_create(topics, ignore_conflicts=True, batch_size=500)
+
+        linked = []
+        for title, item in extracted.items():
+            for goal in goals.get(title, []):
+                goal.subject_id = subjects[item["subject"]]
+                linked.append(goal)
+
+        LearningGoal.objects.bulk_update(linked, ["subject"], batch_size=500)
+
+    return len(linked)
+
+
+def extract_pending_goal_topics(limit=None):
+    """
+    Topics for every goal without a subject. Goals with the same
+    normalized title share one extraction, so the API cost is one
+    request per BATCH_SIZE distinct goals.
+
+    Returns (goals linked, requests made).
+    """
+    pending = LearningGoal.objects.filter(subject__isnull=True).only("id", "title", "user_id")
+
+    groups = {}
+    for goal in pending.iterator():
+        key = normalize_goal_title(goal.title) or goal.title.lower()
+        groups.setdefault(key, []).append(goal)
+
+    keys = list(groups)[:limit] if limit else list(groups)
+
+    extracted = {}
+    goals = {}
+    requests_made = 0
+
+    for i in range(0, len(keys), BATCH_SIZE):
+        batch = {groups[key][0].title: groups[key] for key in keys[i:i + BATCH_SIZE]}
+        extracted.update(extract_topics_batch(list(batch)))
+        goals.update(batch)
+        requests_made += 1
+
+    return save_extracted_topics(extracted, goals), requests_made
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import F, Sum, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.models import AIUsageDaily
+from core.services.upserts import increment
+
+# -------------------------------------------------
+# PRICING
+# -------------------------------------------------
+
+# USD per million (prompt, completion) tokens; AI_MODEL_PRICES overrides
+# or adds models, e.g. {"llama-3.3-70b-versatile": (0.59, 0.79)}
+MODEL_PRICES = {
+    "llama-3.3-70b-versatile": (Decimal("0.59"), Decimal("0.79")),
+    "llama-3.1-8b-instant": (Decimal("0.05"), Decimal("0.08")),
+    **{
+        model: (Decimal(str(prompt)), Decimal(str(completion)))
+        for model, (prompt, completion) in getattr(settings, "AI_MODEL_PRICES", {}).items()
+    },
+}
+
+MILLION = Decimal(1_000_000)
+
+
+def call_cost(model, prompt_tokens, completion_tokens):
+    """
+    USD for one call; 0 for models without a price.
+    """
+    prompt_price, completion_price = MODEL_PRICES.get(model, (Decimal(0), Decimal(0)))
+    cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / MILLION
+    return cost.quantize(Decimal("0.000001"))
+
+
+# -------------------------------------------------
+# USAGE RECORDING
+# -------------------------------------------------
+
+# call status -> AIUsageDaily error column; "ok" and unknown statuses
+# have none ("error" is still counted in errors)
+STATUS_FIELDS = {
+    "rate_limited": "rate_limited",
+    "client_error": "client_errors",
+    "server_error": "server_errors",
+    "timeout": "timeouts",
+    "busy": "shed",
+}
+
+
+def record_ai_call(feature, model, user=None, status="ok", prompt_tokens=0,
+                   completion_tokens=0, elapsed_ms=0, ttfb_ms=0):
+    """
+    Adds one Groq call to its (user, day, feature, model) row.
+    `status` is "ok" or an error class: rate_limited, client_error,
+    server_error, timeout, busy (shed locally) or error.
+    Never raises: accounting must not break the AI feature itself.
+    """
+    prompt_tokens = prompt_tokens or 0
+    completion_tokens = completion_tokens or 0
+
+    lookup = {
+        "user_id": getattr(user, "pk", user),
+        "date": timezone.localdate(),
+        "feature": feature,
+        "model": model,
+    }
+    deltas = {
+        "calls": 1,
+        "errors": 0 if status == "ok" else 1,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost": call_cost(model, prompt_tokens, completion_tokens),
+        "total_ms": int(elapsed_ms),
+        "ttfb_ms": int(ttfb_ms),
+    }
+    if status in STATUS_FIELDS:
+        deltas[STATUS_FIELDS[status]] = 1
+    elapsed_ms = int(elapsed_ms)
+
+    try:
+        increment(
+            AIUsageDaily,
+            lookup,
+            deltas,
+            values={"max_ms": elapsed_ms},
+            update_values={"max_ms": Greatest(F("max_ms"), Value(elapsed_ms))},
+        )
+
+    except Exception as e:
+        print("AI usage record error:", e)
+
+
+# -------------------------------------------------
+# REPORTS
+# -------------------------------------------------
+
+def usage_report(days=30, top_users=10):
+    """
+    Per-feature, per-model and per-user totals (calls, errors by status
+    class, tokens, cost) over the last `days` days, for the admin report.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = AIUsageDaily.objects.filter(date__gte=since)
+
+    totals = dict(
+        calls=Sum("calls"),
+        errors=Sum("errors"),
+        **{field: Sum(field) for field in STATUS_FIELDS.values()},
+        prompt_tokens=Sum("prompt_tokens"),
+        completion_tokens=Sum("completion_tokens"),
+        cost=Sum("cost"),
+        total_ms=Sum("total_ms"),
+        ttfb_ms=Sum("ttfb_ms"),
+    )
+
+    features = list(
+        rows.values("feature", "model")
+        .annotate(**totals)
+        .order_by("-cost", "-prompt_tokens")
+    )
+    for row in features:
+        calls = row["calls"] or 1
+        row["avg_ms"] = row["total_ms"] // calls
+        row["avg_ttfb_ms"] = row["ttfb_ms"] // calls
+        row["avg_prompt_tokens"] = row["prompt_tokens"] // calls
+
+    models = list(
+        rows.values("model")
+        .annotate(**totals)
+        .order_by("-cost")
+    )
+
+    users = list(
+        rows.values("user__username")
+        .annotate(**totals)
+        .order_by("-cost", "-prompt_tokens")[:top_users]
+    )
+
+    return {
+        "days": days,
+        "features": features,
+        "models": models,
+        "users": users,
+        "total_cost": sum((row["cost"] or 0 for row in models), Decimal(0)),
+    }
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+# -------------------------------------------------
+# BACKGROUND CONFIG
+# -------------------------------------------------
+
+# threads shared by every slow job (AI calls) in this process
+MAX_WORKERS = getattr(settings, "BACKGROUND_WORKERS", 4)
+
+_executor = None
+_running = {}
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_WORKERS,
+                thread_name_prefix="background",
+            )
+        return _executor
+
+
+# -------------------------------------------------
+# SUBMIT
+# -------------------------------------------------
+
+def run_in_background(key, fn, *args, **kwargs):
+    """
+    Runs fn(*args, **kwargs) on the background pool and returns its future.
+
+    Jobs are deduplicated by `key`: while one is queued or running, the
+    same key returns the existing future instead of submitting again.
+    With BACKGROUND_JOBS = False the job runs inline (tests, debugging).
+    """
+    if not getattr(settings, "BACKGROUND_JOBS", True):
+        return _run_inline(fn, *args, **kwargs)
+
+    with _lock:
+        future = _running.get(key)
+        if future is not None:
+            return future
+
+    executor = _get_executor()
+
+    with _lock:
+        future = _running.get(key)
+        if future is None:
+            future = executor.submit(_run, key, fn, args, kwargs)
+            _running[key] = future
+
+    return future
+
+
+def is_running(key):
+    with _lock:
+        return key in _running
+
+
+def _run(key, fn, args, kwargs):
+    # each worker thread has its own DB connection; drop stale ones
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        print(f"Background job {key} failed:", e)
+    finally:
+        close_old_connections()
+        with _lock:
+            _running.pop(key, None)
+
+
+def _run_inline(fn, *args, **kwargs):
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
@@ -1,6 +1,7 @@
 import requests
 from django.utils import timezone
-from core.models import PlatformAccount, UserStats
+from core.models import PlatformAccount
+from core.services.xp import commit_platform_xp
 
 def get_cf_stats(username: str):
     url = f"https://codeforces.com/api/user.status?handle={username}"
@@ -29,23 +30,16 @@ def sync_codeforces_by_username(user):
     solved = get_cf_stats(account.username)
     xp = solved * 12
 
-    stats, _ = UserStats.objects.get_or_create(user=user)
-
-    stats.codeforces_solved = solved
-    stats.codeforces_xp = xp
-
-    stats.total_xp = (
-        stats.total_commits * 10 +
-        stats.leetcode_xp +
-        stats.gfg_xp +
-        stats.codeforces_xp
+    commit_platform_xp(
+        user,
+        "codeforces",
+        xp,
+        account=account,
+        codeforces_username=account.username,
+        codeforces_solved=solved,
     )
 
-    stats.level = max(1, stats.total_xp // 100 + 1)
-    stats.last_updated = timezone.now()
-    stats.save()
-
     account.last_synced = timezone.now()
-    account.save()
+    account.save(update_fields=["last_synced"])
 
     return solved
\ No newline at end of file
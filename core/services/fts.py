@@ -0,0 +1,48 @@
+import re
+
+from django.db import connection
+
+# -------------------------------------------------
+# FULL-TEXT SEARCH (SQLITE FTS5)
+# -------------------------------------------------
+
+# FTS5 tables are created by migrations on SQLite only;
+# on other databases searches return nothing.
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "do", "does",
+    "for", "from", "how", "i", "if", "in", "is", "it", "me", "my", "of", "on",
+    "or", "so", "that", "the", "this", "to", "was", "what", "when", "where",
+    "which", "who", "why", "will", "with", "you", "your",
+}
+
+MAX_TERMS = 16
+
+
+def fts_enabled():
+    return connection.vendor == "sqlite"
+
+
+def match_terms(text, max_terms=MAX_TERMS):
+    """
+    FTS5 MATCH expression that ORs the distinct words of `text`, so
+    bm25() ranks rows by how many (and how rare) terms they share.
+    Each term is quoted, so user text can't inject query syntax.
+    Returns "" when nothing searchable is left.
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    terms = [w for w in dict.fromkeys(words) if len(w) > 1 and w not in STOPWORDS]
+
+    return " OR ".join(f'"{term}"' for term in terms[:max_terms])
+
+
+def search(sql, params):
+    """
+    Runs a ranked FTS query; returns [] when FTS is unavailable.
+    """
+    if not fts_enabled():
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
@@ -1,6 +1,7 @@
 from playwright.sync_api import sync_playwright
 from django.utils import timezone
-from core.models import PlatformAccount, UserStats
+from core.models import PlatformAccount
+from core.services.xp import commit_platform_xp
 
 
 # ---------------------------------------------------
@@ -67,26 +68,19 @@ def sync_gfg_by_username(user):
     # ✅ YOUR REQUIRED FORMULA
     xp = (score * 10) + (solved * 5)
 
-    stats, _ = UserStats.objects.get_or_create(user=user)
-
-    stats.gfg_username = account.username
-    stats.gfg_solved = solved
-    stats.gfg_xp = xp
-    stats.last_updated = timezone.now()
-    stats.save(update_fields=[
-        "gfg_username",
-        "gfg_solved",
-        "gfg_xp",
-        "last_updated"
-    ])
+    # ✅ one UPDATE, global totals recomputed in SQL
+    commit_platform_xp(
+        user,
+        "gfg",
+        xp,
+        account=account,
+        gfg_username=account.username,
+        gfg_solved=solved,
+    )
 
     account.last_synced = timezone.now()
     account.save(update_fields=["last_synced"])
 
-    # ✅ Always recompute global totals safely
-    if hasattr(stats, "recalculate_totals"):
-        stats.recalculate_totals()
-
     return {
         "solved": solved,
         "score": score,
@@ -1,7 +1,8 @@
 import os
 import requests
 from django.utils import timezone
-from core.models import PlatformAccount, UserStats
+from core.models import PlatformAccount
+from core.services.xp import commit_platform_xp
 
 GITHUB_GRAPHQL = "https://api.github.com/graphql"
 GITHUB_REST = "https://api.github.com"
@@ -103,17 +104,16 @@ def sync_github_activity(account):
     # --------------------------------
     xp = (repos * 15) + (contributions * 5)
 
-    stats, _ = UserStats.objects.get_or_create(user=account.user)
-
-    stats.github_username = username
-    stats.github_repos = repos
-    stats.total_commits = contributions
-    stats.github_xp = xp
-    stats.last_updated = timezone.now()
-    stats.save()
-
-    # safe global recompute
-    stats.recalculate_totals()
+    # single write, totals recomputed in SQL
+    commit_platform_xp(
+        account.user,
+        "github",
+        xp,
+        account=account,
+        github_username=username,
+        github_repos=repos,
+        total_commits=contributions,
+    )
 
     account.last_synced = timezone.now()
     account.save(update_fields=["last_synced"])
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 from django.conf import settings
 from django.utils import timezone
 
-from core.models import UserStats
+from core.services.xp import commit_platform_xp
 
 # =====================================
 # CONFIG
@@ -78,25 +78,18 @@ def sync_github_by_username(account):
 
     total_commits = get_total_contributions(account.username)
 
-    stats, _ = UserStats.objects.get_or_create(user=account.user)
-
     github_xp = total_commits * XP_PER_COMMIT
 
-    stats.total_commits = total_commits
-    stats.github_xp = github_xp
-
-    # 🔗 merge all platforms
-    stats.total_xp = (
-        (stats.github_xp or 0) +
-        (stats.leetcode_xp or 0) +
-        (stats.gfg_xp or 0)
+    # 🔗 all platforms merged in SQL by the commit
+    commit_platform_xp(
+        account.user,
+        "github",
+        github_xp,
+        account=account,
+        total_commits=total_commits,
     )
 
-    stats.level = max(1, (stats.total_xp // XP_PER_LEVEL) + 1)
-    stats.last_updated = timezone.now()
-    stats.save()
-
     account.last_synced = timezone.now()
-    account.save()
+    account.save(update_fields=["last_synced"])
 
     return total_commits
@@ -0,0 +1,354 @@
+import hashlib
+import random
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from core.models import RoadmapCache
+from core.services.background import run_in_background
+
+# -------------------------------------------------
+# GOAL INDEX CONFIG
+# -------------------------------------------------
+
+# minimum trigram Jaccard similarity for reusing another goal's roadmap
+THRESHOLD = getattr(settings, "ROADMAP_SIMILARITY_THRESHOLD", 0.6)
+
+# two words closer than this (trigram Jaccard) count as the same word,
+# e.g. "structure" / "structures" or a typo; "sql" / "nosql" do not
+TOKEN_THRESHOLD = 0.5
+
+# LSH: BANDS x ROWS MinHash values. Two titles share a bucket with
+# probability 1 - (1 - s^ROWS)^BANDS: ~0.88 at s=0.6, ~0.12 at s=0.3.
+BANDS = 16
+ROWS = 4
+
+# candidates re-scored exactly, most shared bands first
+MAX_CANDIDATES = 32
+
+# refreshes bigger than this rebuild the band arrays instead of inserting
+BULK_LOAD_ROWS = 1000
+
+# new rows written by other workers are picked up this often (seconds)
+REFRESH_INTERVAL = 60
+
+BACKFILL_SQL = "UPDATE core_roadmapcache SET band_hashes = %s WHERE id = %s"
+
+_rng = random.Random(20240601)
+_MASKS = [_rng.getrandbits(32) for _ in range(BANDS * ROWS)]
+
+
+# -------------------------------------------------
+# SIGNATURES
+# -------------------------------------------------
+
+@lru_cache(maxsize=65536)
+def _token_grams(token):
+    padded = f" {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def trigrams(normalized):
+    """
+    Character trigrams per token, padded so short words still count.
+    Token order does not matter.
+    """
+    return set().union(*map(_token_grams, normalized.split()))
+
+
+def minhash(grams):
+    # one crc32 per trigram; XOR with a random mask stands in for each
+    # hash function
+    hashed = [zlib.crc32(g.encode()) for g in grams]
+    return [min(h ^ mask for h in hashed) for mask in _MASKS]
+
+
+@lru_cache(maxsize=65536)
+def _token_minhash(token):
+    return tuple(minhash(_token_grams(token)))
+
+
+def signature(normalized):
+    """
+    MinHash of the title's trigrams. The trigram set is the union of its
+    words' sets, so this is the elementwise min of (cached) per-word
+    signatures: the same result as minhash(trigrams(...)), far cheaper.
+    """
+    return [min(column) for column in zip(*map(_token_minhash, normalized.split()))]
+
+
+def band_hashes(signature):
+    """
+    One 64-bit hash per band. Stable across processes, so it can be
+    stored with the roadmap and loaded instead of recomputed.
+    """
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                array("I", signature[band * ROWS:(band + 1) * ROWS]).tobytes(),
+                digest_size=8,
+            ).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def title_hashes(normalized):
+    """
+    Band hashes of a normalized title, or None if it has no trigrams.
+    """
+    return band_hashes(signature(normalized)) if normalized.split() else None
+
+
+def pack_hashes(hashes):
+    return array("q", hashes).tobytes() if hashes else None
+
+
+def unpack_hashes(data):
+    hashes = array("q")
+    hashes.frombytes(bytes(data))
+    return hashes if len(hashes) == BANDS else None
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@lru_cache(maxsize=65536)
+def _same_word(a, b):
+    return jaccard(_token_grams(a), _token_grams(b)) >= TOKEN_THRESHOLD
+
+
+def unmatched_tokens(a, b):
+    """
+    Words of either title with no close counterpart in the other:
+    what actually tells the two goals apart ("java" vs "python").
+    """
+    a_tokens, b_tokens = a.split(), b.split()
+
+    def lonely(tokens, others):
+        return {
+            token for token in tokens
+            if not any(_same_word(token, other) for other in others)
+        }
+
+    return lonely(a_tokens, b_tokens) | lonely(b_tokens, a_tokens)
+
+
+def compatible(a, b, groups=()):
+    """
+    True if every unmatched word is covered by a synonym group the other
+    title shares part of: "data structures java" still matches
+    "algorithms data java structures" (both from "DSA"), while
+    "development web" does not match "development django web".
+    """
+    a_tokens, b_tokens = set(a.split()), set(b.split())
+
+    for token in unmatched_tokens(a, b):
+        other = b_tokens if token in a_tokens else a_tokens
+        if not any(token in group and group & other for group in groups):
+            return False
+
+    return True
+
+
+# -------------------------------------------------
+# INDEX
+# -------------------------------------------------
+
+class GoalIndex:
+    """
+    In-memory MinHash/LSH index of cached roadmap titles.
+
+    Each band is a sorted array of bucket hashes with a parallel array of
+    entry ids, so 100k titles take a few MB and a lookup is BANDS binary
+    searches plus an exact Jaccard over a handful of candidates.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.titles = []
+        self.known = set()
+        self.band_keys = [array("q") for _ in range(BANDS)]
+        self.band_ids = [array("l") for _ in range(BANDS)]
+
+        self.max_id = 0
+        self.refreshed_at = None
+        # writers serialize on write_lock; lock guards what lookups read
+        self.write_lock = threading.Lock()
+        self.lock = threading.Lock()
+
+    def add(self, key, normalized, hashes=None):
+        hashes = hashes or title_hashes(normalized)
+        if not hashes:
+            return
+
+        with self.write_lock, self.lock:
+            if key in self.known:
+                return
+
+            entry = len(self.keys)
+            self.keys.append(key)
+            self.titles.append(normalized)
+            self.known.add(key)
+
+            for band, bucket in enumerate(hashes):
+                pos = bisect_left(self.band_keys[band], bucket)
+                self.band_keys[band].insert(pos, bucket)
+                self.band_ids[band].insert(pos, entry)
+
+    def add_many(self, rows):
+        """
+        Bulk insert of (key, normalized, hashes) rows, hashes being None
+        when not stored yet: one sort per band instead of an insert per
+        row. The new arrays are built aside and swapped in, so lookups
+        are not blocked meanwhile.
+        """
+        with self.write_lock:
+            keys = list(self.keys)
+            titles = list(self.titles)
+            known = set(self.known)
+            first = len(keys)
+
+            # BANDS hashes per new entry, back to back
+            added = array("q")
+
+            for key, normalized, hashes in rows:
+                if key in known:
+                    continue
+
+                hashes = hashes or title_hashes(normalized)
+                if not hashes:
+                    continue
+
+                keys.append(key)
+                titles.append(normalized)
+                known.add(key)
+                added.extend(hashes)
+
+            band_keys, band_ids = [], []
+            for band in range(BANDS):
+                buckets = self.band_keys[band].tolist() + added[band::BANDS].tolist()
+                entries = self.band_ids[band].tolist() + list(range(first, len(keys)))
+
+                order = sorted(range(len(buckets)), key=buckets.__getitem__)
+                band_keys.append(array("q", map(buckets.__getitem__, order)))
+                band_ids.append(array("l", map(entries.__getitem__, order)))
+
+            with self.lock:
+                self.keys, self.titles, self.known = keys, titles, known
+                self.band_keys, self.band_ids = band_keys, band_ids
+
+    def query(self, normalized, threshold=THRESHOLD, groups=()):
+        """
+        (key, similarity) of the closest indexed title, or None.
+        Candidates above the threshold must also agree word by word
+        (see compatible), since whole-title similarity alone rates
+        "dsa java" close to "dsa python".
+        """
+        grams = trigrams(normalized)
+        if not grams:
+            return None
+
+        hashes = band_hashes(signature(normalized))
+        shared = Counter()
+
+        with self.lock:
+            for band, bucket in enumerate(hashes):
+                keys = self.band_keys[band]
+                lo = bisect_left(keys, bucket)
+                hi = bisect_right(keys, bucket, lo)
+                if lo < hi:
+                    shared.update(self.band_ids[band][lo:hi])
+
+            candidates = [
+                (self.keys[entry], self.titles[entry])
+                for entry, _ in shared.most_common(MAX_CANDIDATES)
+            ]
+
+        best = None
+        for key, title in candidates:
+            score = jaccard(grams, trigrams(title))
+            if score < threshold or (best is not None and score <= best[1]):
+                continue
+            if compatible(normalized, title, groups):
+                best = (key, score)
+
+        return best
+
+    def refresh(self):
+        """
+        Incremental load: only rows created since the last refresh, using
+        their stored band hashes. Rows stored before hashes were kept get
+        them computed once and written back.
+        """
+        rows = []
+        missing = []
+
+        for pk, key, normalized, stored in (
+            RoadmapCache.objects
+            .filter(id__gt=self.max_id)
+            .order_by("id")
+            .values_list("id", "key", "normalized_title", "band_hashes")
+            .iterator(chunk_size=2000)
+        ):
+            hashes = unpack_hashes(stored) if stored else None
+            if hashes is None:
+                hashes = title_hashes(normalized)
+                missing.append((pack_hashes(hashes), pk))
+            rows.append((pk, key, normalized, hashes))
+
+        if len(rows) > BULK_LOAD_ROWS:
+            self.add_many((key, normalized, hashes) for _, key, normalized, hashes in rows)
+        else:
+            for _, key, normalized, hashes in rows:
+                self.add(key, normalized, hashes)
+
+        if missing:
+            # one prepared statement; bulk_update's CASE WHEN is far slower
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(BACKFILL_SQL, missing)
+
+        if rows:
+            self.max_id = rows[-1][0]
+
+        self.refreshed_at = time.monotonic()
+
+    def is_stale(self):
+        return (
+            self.refreshed_at is None
+            or time.monotonic() - self.refreshed_at > REFRESH_INTERVAL
+        )
+
+    def __len__(self):
+        return len(self.keys)
+
+
+_index = GoalIndex()
+
+
+def find_similar(normalized, threshold=THRESHOLD, groups=()):
+    """
+    Closest cached title above the threshold. Loading and refreshing
+    happen in the background; until the first load finishes every
+    lookup is a miss rather than a wait.
+    """
+    if _index.is_stale():
+        run_in_background("goal-index-refresh", _index.refresh)
+
+    return _index.query(normalized, threshold, groups)
+
+
+def index_goal(key, normalized, hashes=None):
+    _index.add(key, normalized, hashes)
@@ -1,66 +1,331 @@
+import hashlib
+import json
+import time
+
 import requests
 from django.conf import settings
 
+from core.services.ai_limits import AIBusy, ai_slot
+from core.services.ai_router import choose_route, model_chain, record_route, timeout_for
+from core.services.ai_usage import record_ai_call
+from core.services.single_flight import single_flight
+
 # -------------------------------------------------
 # GROQ CONFIG
 # -------------------------------------------------
 
 GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
-MODEL = "llama-3.3-70b-versatile"
+
+# used when a 429 comes without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 10
 
 
 # -------------------------------------------------
 # CORE GROQ CALLER (SAFE)
 # -------------------------------------------------
 
-def call_groq(messages, temperature=0.4):
-    api_key = getattr(settings, "GROQ_API_KEY", None)
+# call_groq / stream_groq report failures as text starting with these
+ERROR_PREFIXES = ("❌", "⚠️")
+
+
+def is_ai_error(reply):
+    return not reply or reply.startswith(ERROR_PREFIXES)
 
-    if not api_key:
-        return "❌ GROQ_API_KEY not found in Django settings."
 
-    headers = {
+class StreamError(str):
+    """
+    An error chunk yielded by stream_groq: plain text to callers that
+    just relay it, but distinguishable from model tokens.
+    """
+
+
+def _headers(api_key):
+    return {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json"
     }
 
+
+def call_groq(messages, temperature=0.4, feature="other", user=None, json_mode=False):
+    """
+    `feature` picks the model route (see ai_router) and, with `user`,
+    labels the call in AIUsageDaily.
+    With json_mode the model is constrained to return one JSON object.
+
+    Identical concurrent payloads (model, temperature, messages) share
+    one upstream request across threads and worker processes.
+    """
+    api_key = getattr(settings, "GROQ_API_KEY", None)
+
+    if not api_key:
+        return "❌ GROQ_API_KEY not found in Django settings."
+
+    route = choose_route(feature, messages)
+    chain = model_chain(route)
+
     payload = {
-        "model": MODEL,
+        "model": chain[0],
         "messages": messages,
         "temperature": temperature
     }
 
-    try:
-        response = requests.post(
-            GROQ_URL,
-            headers=headers,
-            json=payload,
-            timeout=60
+    if json_mode:
+        payload["response_format"] = {"type": "json_object"}
+
+    key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    return single_flight(
+        key,
+        lambda: _call_chain(api_key, payload, route, chain, feature, user),
+        shareable=lambda reply: not is_ai_error(reply),
+    )
+
+
+def _call_chain(api_key, payload, route, chain, feature, user):
+    """
+    Tries the route's models in order; the next one is used only when
+    the previous call failed upstream (timeout, 429, 5xx).
+    """
+    for i, model in enumerate(chain):
+        started = time.monotonic()
+        reply, retryable = _post(api_key, {**payload, "model": model}, feature, user)
+        fallback = retryable and i + 1 < len(chain)
+
+        record_route(
+            route,
+            model,
+            ok=not is_ai_error(reply),
+            elapsed_ms=(time.monotonic() - started) * 1000,
+            reply_chars=len(reply.strip()),
+            fallback=fallback,
         )
 
+        if not fallback:
+            return reply
+
+
+def _post(api_key, payload, feature, user):
+    """
+    (reply, retryable): retryable errors are worth another model.
+    """
+    usage = {}
+    status = "error"
+    ttfb_ms = 0
+    started = time.monotonic()
+
+    try:
+        with ai_slot():
+            response = requests.post(
+                GROQ_URL,
+                headers=_headers(api_key),
+                json=payload,
+                timeout=timeout_for(payload["model"])
+            )
+        ttfb_ms = response.elapsed.total_seconds() * 1000
+
         if response.status_code != 200:
             print("Groq error:", response.text)
-            return "⚠️ AI service is temporarily unavailable. Please try again."
+            _note_rate_limit(response)
+            status = _status_class(response)
+            return "⚠️ AI service is temporarily unavailable. Please try again.", _retryable(response)
 
         data = response.json()
 
         if "choices" not in data:
-            return "❌ Groq returned unexpected response."
+            return "❌ Groq returned unexpected response.", True
+
+        usage = data.get("usage") or {}
+        status = "ok"
+        return data["choices"][0]["message"]["content"], False
+
+    except AIBusy as e:
+        status = "busy"
+        return f"⚠️ {e}", False
+
+    except requests.exceptions.Timeout:
+        status = "timeout"
+        return "❌ Groq API timeout. Please try again.", True
+
+    except Exception as e:
+        return f"❌ Groq API error: {str(e)}", True
+
+    finally:
+        _record(feature, payload["model"], user, status, usage, started, ttfb_ms)
+
+
+def _retryable(response):
+    # rate limits are per model, so a 429 is worth another model too
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def _status_class(response):
+    if response.status_code == 429:
+        return "rate_limited"
+    return "server_error" if response.status_code >= 500 else "client_error"
+
+
+def _record(feature, model, user, status, usage, started, ttfb_ms):
+    record_ai_call(
+        feature,
+        model,
+        user=user,
+        status=status,
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        completion_tokens=usage.get("completion_tokens", 0),
+        elapsed_ms=(time.monotonic() - started) * 1000,
+        ttfb_ms=ttfb_ms,
+    )
+
+
+# -------------------------------------------------
+# RATE LIMITS
+# -------------------------------------------------
+
+# monotonic time until which Groq asked us to back off (HTTP 429)
+_cooldown_until = 0.0
+
+
+def _note_rate_limit(response):
+    global _cooldown_until
 
-        return data["choices"][0]["message"]["content"]
+    if response.status_code != 429:
+        return
+
+    try:
+        retry_after = float(response.headers.get("retry-after", DEFAULT_RETRY_AFTER))
+    except ValueError:
+        retry_after = DEFAULT_RETRY_AFTER
+
+    _cooldown_until = max(_cooldown_until, time.monotonic() + retry_after)
+
+
+def rate_limit_cooldown():
+    """
+    Seconds left before Groq accepts requests again (0 if not limited).
+    Batch jobs wait this out; live requests are not held back.
+    """
+    return max(0.0, _cooldown_until - time.monotonic())
+
+
+# -------------------------------------------------
+# STREAMING GROQ CALLER
+# -------------------------------------------------
+
+def stream_groq(messages, temperature=0.4, feature="other", user=None):
+    """
+    Yields completion tokens as Groq produces them (stream: true).
+    Errors are yielded as a single StreamError chunk, with the text
+    call_groq would return.
+
+    Falls back to the route's next model only if the failed model has
+    not streamed anything yet.
+    """
+    api_key = getattr(settings, "GROQ_API_KEY", None)
+
+    if not api_key:
+        yield StreamError("❌ GROQ_API_KEY not found in Django settings.")
+        return
+
+    route = choose_route(feature, messages)
+    chain = model_chain(route)
+
+    payload = {
+        "messages": messages,
+        "temperature": temperature,
+        "stream": True,
+        "stream_options": {"include_usage": True}
+    }
+
+    for i, model in enumerate(chain):
+        started = time.monotonic()
+        error, retryable, chars = yield from _stream(api_key, {**payload, "model": model}, feature, user)
+        fallback = bool(error) and retryable and not chars and i + 1 < len(chain)
+
+        record_route(
+            route,
+            model,
+            ok=not error,
+            elapsed_ms=(time.monotonic() - started) * 1000,
+            reply_chars=chars,
+            fallback=fallback,
+        )
+
+        if not fallback:
+            if error:
+                yield StreamError(error)
+            return
+
+
+def _stream(api_key, payload, feature, user):
+    """
+    Yields tokens for one model; returns (error, retryable, chars streamed).
+    """
+    usage = {}
+    status = "error"
+    ttfb_ms = 0
+    chars = 0
+    started = time.monotonic()
+
+    try:
+        with ai_slot() as renew_slot, requests.post(
+            GROQ_URL,
+            headers=_headers(api_key),
+            json=payload,
+            timeout=timeout_for(payload["model"]),
+            stream=True
+        ) as response:
+
+            if response.status_code != 200:
+                print("Groq error:", response.text)
+                _note_rate_limit(response)
+                status = _status_class(response)
+                return "⚠️ AI service is temporarily unavailable. Please try again.", _retryable(response), 0
+
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue
+
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+
+                # the stream can outlive a fixed lease; keep the slot ours
+                renew_slot()
+
+                chunk = json.loads(data)
+                usage = chunk.get("usage") or chunk.get("x_groq", {}).get("usage") or usage
+
+                choices = chunk.get("choices") or [{}]
+                token = choices[0].get("delta", {}).get("content")
+                if token:
+                    if not ttfb_ms:
+                        ttfb_ms = (time.monotonic() - started) * 1000
+                    chars += len(token)
+                    yield token
+
+            status = "ok"
+            return None, False, chars
+
+    except AIBusy as e:
+        status = "busy"
+        return f"⚠️ {e}", False, chars
 
     except requests.exceptions.Timeout:
-        return "❌ Groq API timeout. Please try again."
+        status = "timeout"
+        return "❌ Groq API timeout. Please try again.", True, chars
 
     except Exception as e:
-        return f"❌ Groq API error: {str(e)}"
+        return f"❌ Groq API error: {str(e)}", True, chars
+
+    finally:
+        _record(feature, payload["model"], user, status, usage, started, ttfb_ms)
 
 
 # -------------------------------------------------
 # AI ROADMAP GENERATOR
 # -------------------------------------------------
 
-def generate_goal_solution(goal_title: str) -> str:
+def generate_goal_solution(goal_title: str, user=None, feature="roadmap") -> str:
     """
     Generates a structured AI learning roadmap using Groq.
     """
@@ -89,19 +354,14 @@ Return clearly in this format:
         }
     ]
 
-    return call_groq(messages)
+    return call_groq(messages, feature=feature, user=user)
 
 
 # -------------------------------------------------
 # TASK AI ASSISTANT (CHAT MODE)
 # -------------------------------------------------
 
-def generate_task_ai_reply(task, user_message: str) -> str:
-    """
-    Task-aware AI assistant.
-    Supports explaining, solving, revising, quizzing.
-    """
-
+def build_task_messages(task, user_message: str, history=None) -> list:
     system_prompt = f"""
 You are a professional study assistant.
 
@@ -119,9 +379,26 @@ Your behavior:
 Always be clear, structured, and encouraging.
 """
 
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
+        *(history or []),
         {"role": "user", "content": user_message}
     ]
 
-    return call_groq(messages, temperature=0.5)
+
+def generate_task_ai_reply(task, user_message: str, history=None, feature="task_chat") -> str:
+    """
+    Task-aware AI assistant.
+    Supports explaining, solving, revising, quizzing.
+    `history` is earlier chat context (see task_ai.build_task_history).
+    """
+    messages = build_task_messages(task, user_message, history)
+    return call_groq(messages, temperature=0.5, feature=feature, user=task.user_id)
+
+
+def stream_task_ai_reply(task, user_message: str, history=None, feature="task_chat"):
+    """
+    Streaming variant of generate_task_ai_reply, yields tokens.
+    """
+    messages = build_task_messages(task, user_message, history)
+    return stream_groq(messages, temperature=0.5, feature=feature, user=task.user_id)
@@ -1,6 +1,7 @@
 import requests
 from django.utils import timezone
-from core.models import PlatformAccount, UserStats
+from core.models import PlatformAccount
+from core.services.xp import commit_platform_xp
 
 def get_hr_solved(username: str):
     url = f"https://www.hackerrank.com/rest/hackers/{username}/profile"
@@ -21,24 +22,16 @@ def sync_hackerrank_by_username(user):
     solved = get_hr_solved(account.username)
     xp = solved * 6
 
-    stats, _ = UserStats.objects.get_or_create(user=user)
-
-    stats.hackerrank_solved = solved
-    stats.hackerrank_xp = xp
-
-    stats.total_xp = (
-        stats.total_commits * 10 +
-        stats.leetcode_xp +
-        stats.gfg_xp +
-        stats.codeforces_xp +
-        stats.hackerrank_xp
+    commit_platform_xp(
+        user,
+        "hackerrank",
+        xp,
+        account=account,
+        hackerrank_username=account.username,
+        hackerrank_solved=solved,
     )
 
-    stats.level = max(1, stats.total_xp // 100 + 1)
-    stats.last_updated = timezone.now()
-    stats.save()
-
     account.last_synced = timezone.now()
-    account.save()
+    account.save(update_fields=["last_synced"])
 
     return solved
\ No newline at end of file
@@ -0,0 +1,247 @@
+import base64
+from collections import defaultdict
+from datetime import date
+from math import ceil
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core.models import DailyActivity, JobWatermark, StudySession, Task, UserHeatmap
+from core.services.rollups import STUDY_XP_PER_MINUTE
+from core.services.watermarks import get_watermark, set_watermark
+
+# -------------------------------------------------
+# HEATMAP CONFIG
+# -------------------------------------------------
+
+WATERMARK = "heatmap"
+USER_CHUNK = 500
+BATCH_SIZE = 2000
+
+TASK_COMPLETION_XP = 20
+STUDY_MINUTES_PER_POINT = 15
+
+# activity_score lower bounds for intensity levels 1..4 (0 = no activity)
+INTENSITY_LEVELS = (1, 3, 6, 10)
+PAYLOAD_CACHE_TTL = 60 * 60 * 24
+
+
+# -------------------------------------------------
+# TOUCHED DATES
+# -------------------------------------------------
+
+def _touched_days(since):
+    """
+    (user_id, date) pairs whose sources changed after `since`.
+    """
+    activities = DailyActivity.objects.all()
+    sessions = StudySession.objects.all()
+    tasks = Task.objects.filter(completed_at__isnull=False)
+
+    if since is not None:
+        activities = activities.filter(updated_at__gt=since)
+        sessions = sessions.filter(created_at__gt=since)
+        tasks = tasks.filter(completed_at__gt=since)
+
+    touched = defaultdict(set)
+
+    for user_id, day in activities.values_list("account__user_id", "date").distinct():
+        touched[user_id].add(day)
+
+    for user_id, day in sessions.values_list("user_id", "study_date").distinct():
+        touched[user_id].add(day)
+
+    completed = tasks.annotate(day=TruncDate("completed_at"))
+    for user_id, day in completed.values_list("user_id", "day").distinct():
+        touched[user_id].add(day)
+
+    return touched
+
+
+# -------------------------------------------------
+# MERGE
+# -------------------------------------------------
+
+def _merge_chunk(touched):
+    """
+    Recomputes UserHeatmap rows for {user_id: {dates}} with one grouped
+    query per source over the chunk's date range.
+    """
+    user_ids = list(touched)
+    all_days = set().union(*touched.values())
+    day_range = (min(all_days), max(all_days))
+
+    totals = defaultdict(lambda: {"xp": 0, "problems": 0, "commits": 0, "minutes": 0, "tasks": 0})
+
+    platform_rows = (
+        DailyActivity.objects
+        .filter(account__user_id__in=user_ids, date__range=day_range)
+        .values("account__user_id", "date")
+        .annotate(xp=Sum("xp"), problems=Sum("problems_solved"), commits=Sum("commits"))
+    )
+    for row in platform_rows:
+        day = totals[(row["account__user_id"], row["date"])]
+        day["xp"] += row["xp"] or 0
+        day["problems"] += row["problems"] or 0
+        day["commits"] += row["commits"] or 0
+
+    study_rows = (
+        StudySession.objects
+        .filter(user_id__in=user_ids, study_date__range=day_range)
+        .values("user_id", "study_date")
+        .annotate(minutes=Sum("duration_minutes"))
+    )
+    for row in study_rows:
+        totals[(row["user_id"], row["study_date"])]["minutes"] += row["minutes"] or 0
+
+    task_rows = (
+        Task.objects
+        .filter(user_id__in=user_ids, completed_at__isnull=False)
+        .annotate(day=TruncDate("completed_at"))
+        .filter(day__range=day_range)
+        .values("user_id", "day")
+        .annotate(count=Count("id"))
+    )
+    for row in task_rows:
+        totals[(row["user_id"], row["day"])]["tasks"] += row["count"]
+
+    rows = []
+    empty = []
+
+    for user_id, days in touched.items():
+        for day in days:
+            t = totals.get((user_id, day))
+
+            if not t or not any(t.values()):
+                empty.append((user_id, day))
+                continue
+
+            rows.append(UserHeatmap(
+                user_id=user_id,
+                date=day,
+                total_xp=(
+                    t["xp"]
+                    + t["minutes"] * STUDY_XP_PER_MINUTE
+                    + t["tasks"] * TASK_COMPLETION_XP
+                ),
+                activity_score=(
+                    t["problems"]
+                    + t["commits"]
+                    + t["tasks"]
+                    + ceil(t["minutes"] / STUDY_MINUTES_PER_POINT)
+                ),
+            ))
+
+    UserHeatmap.objects.bulk_create(
+        rows,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["user", "date"],
+        update_fields=["total_xp", "activity_score"],
+    )
+
+    for user_id, day in empty:
+        UserHeatmap.objects.filter(user_id=user_id, date=day).delete()
+
+    return len(rows)
+
+
+def refresh_heatmap_days(user_id, days):
+    """
+    Immediate recompute for a few days of one user (e.g. a task that was
+    marked incomplete, which leaves no newer timestamp behind).
+    """
+    days = {d for d in days if d}
+    if days:
+        _merge_chunk({user_id: days})
+        set_watermark(_user_watermark(user_id), timezone.now())
+
+
+def _user_watermark(user_id):
+    return f"{WATERMARK}:user:{user_id}"
+
+
+# -------------------------------------------------
+# ROLLUP JOB
+# -------------------------------------------------
+
+def rollup_heatmap(full=False):
+    """
+    Merges platform activity, study minutes and task completions into
+    UserHeatmap for the days touched since the last watermark.
+    """
+    started = timezone.now()
+    since = None if full else get_watermark(WATERMARK)
+
+    touched = _touched_days(since)
+    user_ids = sorted(touched)
+
+    written = 0
+    for i in range(0, len(user_ids), USER_CHUNK):
+        chunk = {user_id: touched[user_id] for user_id in user_ids[i:i + USER_CHUNK]}
+        written += _merge_chunk(chunk)
+
+    set_watermark(WATERMARK, started)
+    return written
+
+
+# -------------------------------------------------
+# PACKED YEAR PAYLOAD
+# -------------------------------------------------
+
+def heatmap_version(user_id):
+    """
+    Changes whenever the user's heatmap rows can have changed: on every
+    rollup run and on an immediate per-user refresh.
+    """
+    stamps = JobWatermark.objects.filter(
+        name__in=[WATERMARK, _user_watermark(user_id)]
+    ).values_list("value", flat=True)
+
+    return max((int(v.timestamp() * 1_000_000) for v in stamps), default=0)
+
+
+def intensity(score):
+    level = 0
+    for bound in INTENSITY_LEVELS:
+        if score >= bound:
+            level += 1
+    return level
+
+
+def build_year_payload(user_id, year):
+    """
+    One byte per day of the year (intensity 0-4), base64-encoded.
+    """
+    start = date(year, 1, 1)
+    end = date(year, 12, 31)
+    packed = bytearray((end - start).days + 1)
+
+    rows = (
+        UserHeatmap.objects
+        .filter(user_id=user_id, date__range=(start, end))
+        .values_list("date", "activity_score")
+    )
+    for day, score in rows:
+        packed[(day - start).days] = intensity(score)
+
+    return {
+        "year": year,
+        "start": start.isoformat(),
+        "days": len(packed),
+        "levels": list(INTENSITY_LEVELS),
+        "data": base64.b64encode(bytes(packed)).decode("ascii"),
+    }
+
+
+def get_year_payload(user_id, year, version):
+    key = f"heatmap:year:{user_id}:{year}:{version}"
+
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_year_payload(user_id, year)
+        cache.set(key, payload, PAYLOAD_CACHE_TTL)
+
+    return payload
@@ -0,0 +1,190 @@
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import Rank
+from django.utils import timezone
+
+from core.models import LeaderboardEntry, UserStats
+from core.services.watermarks import get_watermark, set_watermark
+
+# -------------------------------------------------
+# LEADERBOARD CONFIG
+# -------------------------------------------------
+
+WATERMARK = "leaderboard"
+BATCH_SIZE = 2000
+
+# above this share of changed users a full rebuild is cheaper
+FULL_REBUILD_RATIO = 0.05
+
+# canonical order: xp desc, user desc (a backward scan of (xp, user))
+ORDERING = ("-xp", "-user_id")
+
+
+# -------------------------------------------------
+# FULL REBUILD (WINDOW FUNCTION)
+# -------------------------------------------------
+
+def rebuild_leaderboard():
+    """
+    Recomputes every rank with one RANK() OVER (ORDER BY total_xp DESC)
+    query and upserts the result in batches.
+    """
+    started = timezone.now()
+
+    ranked = (
+        UserStats.objects
+        .annotate(position=Window(Rank(), order_by=F("total_xp").desc()))
+        .values_list("user_id", "total_xp", "position")
+    )
+
+    batch = []
+    written = 0
+
+    with transaction.atomic():
+        for user_id, xp, position in ranked.iterator(chunk_size=BATCH_SIZE):
+            batch.append(LeaderboardEntry(
+                user_id=user_id,
+                xp=xp,
+                rank=position,
+                calculated_at=started,
+            ))
+
+            if len(batch) >= BATCH_SIZE:
+                _upsert(batch)
+                written += len(batch)
+                batch = []
+
+        if batch:
+            _upsert(batch)
+            written += len(batch)
+
+        # users whose stats row disappeared
+        LeaderboardEntry.objects.filter(calculated_at__lt=started).delete()
+
+    set_watermark(WATERMARK, started)
+    return written
+
+
+def _upsert(entries):
+    LeaderboardEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["xp", "rank", "calculated_at"],
+    )
+
+
+# -------------------------------------------------
+# INCREMENTAL REFRESH
+# -------------------------------------------------
+
+def refresh_leaderboard():
+    """
+    Repositions only users whose stats changed since the last run.
+
+    With competition ranking a user moving from old to new XP shifts
+    exactly the entries whose XP lies between the two values, so each
+    move is one range UPDATE on the (xp, user) index plus one range COUNT.
+    Falls back to a full rebuild when too many users moved.
+    """
+    watermark = get_watermark(WATERMARK)
+    if watermark is None:
+        return rebuild_leaderboard()
+
+    started = timezone.now()
+
+    changed = dict(
+        UserStats.objects
+        .filter(last_updated__gt=watermark)
+        .values_list("user_id", "total_xp")
+    )
+
+    current = {}
+    user_ids = list(changed)
+    for i in range(0, len(user_ids), BATCH_SIZE):
+        current.update(
+            LeaderboardEntry.objects
+            .filter(user_id__in=user_ids[i:i + BATCH_SIZE])
+            .values_list("user_id", "xp")
+        )
+
+    moves = [
+        (user_id, current.get(user_id), xp)
+        for user_id, xp in changed.items()
+        if current.get(user_id) != xp
+    ]
+
+    total = LeaderboardEntry.objects.count()
+    if len(moves) > max(100, total * FULL_REBUILD_RATIO):
+        return rebuild_leaderboard()
+
+    with transaction.atomic():
+        for user_id, old_xp, new_xp in moves:
+            _reposition(user_id, old_xp, new_xp, started)
+
+    set_watermark(WATERMARK, started)
+    return len(moves)
+
+
+def _reposition(user_id, old_xp, new_xp, now):
+    others = LeaderboardEntry.objects.exclude(user_id=user_id)
+
+    if old_xp is None:
+        others.filter(xp__lt=new_xp).update(rank=F("rank") + 1)
+    elif new_xp > old_xp:
+        others.filter(xp__gte=old_xp, xp__lt=new_xp).update(rank=F("rank") + 1)
+    else:
+        others.filter(xp__gte=new_xp, xp__lt=old_xp).update(rank=F("rank") - 1)
+
+    rank = others.filter(xp__gt=new_xp).count() + 1
+
+    LeaderboardEntry.objects.update_or_create(
+        user_id=user_id,
+        defaults={"xp": new_xp, "rank": rank, "calculated_at": now},
+    )
+
+
+# -------------------------------------------------
+# READS
+# -------------------------------------------------
+
+def leaderboard_queryset():
+    return (
+        LeaderboardEntry.objects
+        .select_related("user")
+        .order_by(*ORDERING)
+    )
+
+
+def get_rank_context(user, radius=2):
+    """
+    The user's entry plus `radius` neighbours on each side.
+
+    Ties and strictly higher/lower XP are read separately so every query
+    is a LIMITed range scan on (xp, user) instead of a sort.
+    """
+    me = LeaderboardEntry.objects.select_related("user").filter(user=user).first()
+    if not me:
+        return None
+
+    entries = leaderboard_queryset()
+
+    above = list(
+        entries.filter(xp=me.xp, user_id__gt=me.user_id)
+        .order_by("user_id")[:radius]
+    )
+    if len(above) < radius:
+        above += list(
+            entries.filter(xp__gt=me.xp)
+            .order_by("xp", "user_id")[:radius - len(above)]
+        )
+    above.reverse()
+
+    below = list(entries.filter(xp=me.xp, user_id__lt=me.user_id)[:radius])
+    if len(below) < radius:
+        below += list(entries.filter(xp__lt=me.xp)[:radius - len(below)])
+
+    return {
+        "me": me,
+        "neighbours": above + [me] + below,
+    }
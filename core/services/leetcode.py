@@ -1,7 +1,8 @@
 import requests
 from django.utils import timezone
 
-from core.models import PlatformAccount, UserStats
+from core.models import PlatformAccount
+from core.services.xp import commit_platform_xp
 
 LEETCODE_GRAPHQL = "https://leetcode.com/graphql"
 
@@ -106,20 +107,19 @@ def sync_leetcode_by_username(user):
         (contests * 50)
     )
 
-    stats, _ = UserStats.objects.get_or_create(user=user)
-
-    stats.leetcode_username = account.username
-    stats.leetcode_solved = solved
-    stats.leetcode_xp = xp
-    stats.last_updated = timezone.now()
-    stats.save()
+    # ✅ one UPDATE, totals recomputed in SQL
+    commit_platform_xp(
+        user,
+        "leetcode",
+        xp,
+        account=account,
+        leetcode_username=account.username,
+        leetcode_solved=solved,
+    )
 
     account.last_synced = timezone.now()
     account.save(update_fields=["last_synced"])
 
-    # ✅ global recompute
-    stats.recalculate_totals()
-
     return {
         "solved": solved,
         "rating": rating,
@@ -1,6 +1,5 @@
 import requests
-from django.utils import timezone
-from core.models import UserStats
+from core.services.xp import commit_platform_xp
 
 LEETCODE_API = "https://leetcode-stats-api.herokuapp.com"
 
@@ -38,15 +37,12 @@ def sync_leetcode_by_username(user, username: str):
 
     leetcode_xp = (easy * XP_EASY) + (medium * XP_MEDIUM) + (hard * XP_HARD)
 
-    stats, _ = UserStats.objects.get_or_create(user=user)
-
-    # Store leetcode-specific fields if you add them later
-    stats.leetcode_solved = stats_data["total"]
-    stats.leetcode_xp = leetcode_xp
-
-    # For now, just add into total_xp
-    stats.total_xp = leetcode_xp
-    stats.last_updated = timezone.now()
-    stats.save()
+    commit_platform_xp(
+        user,
+        "leetcode",
+        leetcode_xp,
+        leetcode_username=username,
+        leetcode_solved=stats_data["total"],
+    )
 
     return stats_data, leetcode_xp
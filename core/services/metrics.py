@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.models import MetricCounter
+from core.services.upserts import increment
+
+# -------------------------------------------------
+# METRICS CONFIG
+# -------------------------------------------------
+
+# increments are buffered in-process and written at most this often
+FLUSH_INTERVAL = 10
+
+_buffer = Counter()
+_last_flush = time.monotonic()
+_lock = threading.Lock()
+
+
+# -------------------------------------------------
+# COUNTERS
+# -------------------------------------------------
+
+def incr(name, amount=1):
+    """
+    Adds to today's counter `name`. Cheap enough for hot paths:
+    the database sees one UPDATE per name per flush interval.
+    """
+    global _last_flush
+
+    with _lock:
+        _buffer[name] += amount
+
+        if time.monotonic() - _last_flush < FLUSH_INTERVAL:
+            return
+
+        pending = dict(_buffer)
+        _buffer.clear()
+        _last_flush = time.monotonic()
+
+    _write(pending)
+
+
+def flush():
+    global _last_flush
+
+    with _lock:
+        pending = dict(_buffer)
+        _buffer.clear()
+        _last_flush = time.monotonic()
+
+    _write(pending)
+
+
+def _write(pending):
+    today = timezone.localdate()
+
+    for name, amount in pending.items():
+        increment(MetricCounter, {"name": name, "date": today}, {"value": amount})
+
+
+# -------------------------------------------------
+# READS
+# -------------------------------------------------
+
+def get_totals(names, days=7):
+    """
+    {name: total over the last `days` days}, including unflushed counts.
+    """
+    since = timezone.localdate() - timedelta(days=days - 1)
+
+    totals = dict.fromkeys(names, 0)
+    rows = (
+        MetricCounter.objects
+        .filter(name__in=names, date__gte=since)
+        .values("name")
+        .annotate(total=Sum("value"))
+    )
+    for row in rows:
+        totals[row["name"]] = row["total"]
+
+    with _lock:
+        for name in names:
+            totals[name] += _buffer.get(name, 0)
+
+    return totals
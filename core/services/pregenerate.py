@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core.models import LearningGoal, RoadmapCache
+from core.services.groq import generate_goal_solution, is_ai_error, rate_limit_cooldown
+from core.services.roadmap_cache import TTL, cache_key, normalize_goal_title, store_roadmap
+
+# -------------------------------------------------
+# PRE-GENERATION CONFIG
+# -------------------------------------------------
+
+MAX_ATTEMPTS = 3
+
+
+# -------------------------------------------------
+# MINING
+# -------------------------------------------------
+
+def popular_goals(min_count=2, limit=None):
+    """
+    [(normalized, title, count)] for goal titles asked by at least
+    `min_count` goals, most frequent first. `title` is the most common
+    spelling and is what the prompt will see.
+    """
+    counts = Counter()
+    spellings = defaultdict(Counter)
+
+    for title in LearningGoal.objects.values_list("title", flat=True).iterator():
+        normalized = normalize_goal_title(title)
+        if normalized:
+            counts[normalized] += 1
+            spellings[normalized][title.strip()] += 1
+
+    popular = [
+        (normalized, spellings[normalized].most_common(1)[0][0], count)
+        for normalized, count in counts.most_common()
+        if count >= min_count
+    ]
+    return popular[:limit] if limit else popular
+
+
+def uncached(goals):
+    """
+    Drops goals whose roadmap is already cached and not expired,
+    so repeated runs only pay for new titles.
+    """
+    keys = {cache_key(goal[0]): goal for goal in goals}
+    cached = set()
+
+    key_list = list(keys)
+    for i in range(0, len(key_list), 500):
+        cached.update(
+            RoadmapCache.objects
+            .filter(key__in=key_list[i:i + 500], created_at__gt=timezone.now() - TTL)
+            .values_list("key", flat=True)
+        )
+
+    return [goal for key, goal in keys.items() if key not in cached]
+
+
+# -------------------------------------------------
+# GENERATION
+# -------------------------------------------------
+
+class Pacer:
+    """
+    Spaces request starts to at most `per_minute` across all workers
+    and waits out any 429 cooldown reported by the Groq client.
+    """
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0
+        self.next_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_at)
+            self.next_at = start + self.interval
+
+        time.sleep(max(0.0, start - time.monotonic()))
+
+        cooldown = rate_limit_cooldown()
+        while cooldown > 0:
+            time.sleep(cooldown)
+            cooldown = rate_limit_cooldown()
+
+
+def pregenerate_roadmaps(goals, concurrency=3, per_minute=30, log=print):
+    """
+    Generates and stores roadmaps for [(normalized, title, count)] with
+    at most `concurrency` requests in flight. Returns (stored, failed).
+    """
+    pacer = Pacer(per_minute)
+
+    def generate(goal):
+        _, title, count = goal
+        try:
+            for attempt in range(MAX_ATTEMPTS):
+                pacer.wait()
+                content = generate_goal_solution(title, feature="roadmap_pregen")
+
+                if not is_ai_error(content):
+                    store_roadmap(title, content)
+                    log(f"✔ {title} ({count} goals)")
+                    return True
+
+                # retried only when Groq asked us to slow down
+                if not rate_limit_cooldown():
+                    break
+
+            log(f"✘ {title}: {content[:80]}")
+            return False
+        finally:
+            close_old_connections()
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(generate, goals))
+
+    stored = sum(results)
+    return stored, len(results) - stored
@@ -0,0 +1,120 @@
+import re
+
+from django.db import connection
+
+from core.models import Resource
+from core.services.fts import fts_enabled, match_terms
+
+# -------------------------------------------------
+# RESOURCE INDEX CONFIG
+# -------------------------------------------------
+
+# bm25 column weights: title, description, topic, subject
+WEIGHTS = (10.0, 2.0, 5.0, 3.0)
+
+BATCH = 500
+
+INDEX_SQL = """
+    INSERT INTO core_resource_fts(rowid, title, description, topic, subject)
+    SELECT r.id, r.title, r.short_description, t.name, s.name
+    FROM core_resource r
+    JOIN core_topic t ON t.id = r.topic_id
+    JOIN core_subject s ON s.id = t.subject_id
+    WHERE {column} IN ({ids})
+"""
+
+DELETE_SQL = """
+    DELETE FROM core_resource_fts WHERE rowid IN (
+        SELECT r.id
+        FROM core_resource r
+        JOIN core_topic t ON t.id = r.topic_id
+        WHERE {column} IN ({ids})
+    )
+"""
+
+# rank inside the FTS table first, then join only the top rows
+SEARCH_SQL = f"""
+    SELECT r.*
+    FROM (
+        SELECT rowid, bm25(core_resource_fts, {", ".join(map(str, WEIGHTS))}) AS score
+        FROM core_resource_fts
+        WHERE core_resource_fts MATCH %s
+        ORDER BY score
+        LIMIT %s
+    ) ranked
+    JOIN core_resource r ON r.id = ranked.rowid
+    ORDER BY ranked.score
+"""
+
+COLUMNS = {
+    "resource": "r.id",
+    "topic": "r.topic_id",
+    "subject": "t.subject_id",
+}
+
+
+# -------------------------------------------------
+# INDEXING
+# -------------------------------------------------
+
+def reindex_resources(ids, by="resource"):
+    """
+    Rewrites the index rows of resources selected by resource, topic or
+    subject ids. Called from signals and after bulk seeding, which
+    bypasses them.
+    """
+    if not fts_enabled() or not ids:
+        return
+
+    ids = [int(pk) for pk in ids]
+    column = COLUMNS[by]
+
+    with connection.cursor() as cursor:
+        for i in range(0, len(ids), BATCH):
+            batch = ",".join(map(str, ids[i:i + BATCH]))
+
+            cursor.execute(DELETE_SQL.format(column=column, ids=batch))
+            cursor.execute(INDEX_SQL.format(column=column, ids=batch))
+
+
+def remove_resources(ids):
+    if not fts_enabled() or not ids:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM core_resource_fts WHERE rowid IN ({','.join(str(int(pk)) for pk in ids)})"
+        )
+
+
+# -------------------------------------------------
+# RETRIEVAL
+# -------------------------------------------------
+
+def _phrase(column, text):
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return f'{column}:"{" ".join(words)}"' if words else ""
+
+
+def search_resources(query, subject=None, limit=12):
+    """
+    Resources ranked by BM25 against the query words, or whose subject
+    is named `subject`. One indexed query; [] when nothing matches.
+    """
+    if not fts_enabled():
+        return []
+
+    clauses = []
+
+    terms = match_terms(query)
+    if terms:
+        clauses.append(f"({terms})")
+
+    if subject:
+        clauses.append(_phrase("subject", subject))
+
+    clauses = [clause for clause in clauses if clause]
+    if not clauses:
+        return []
+
+    return list(Resource.objects.raw(SEARCH_SQL, [" OR ".join(clauses), limit]))
@@ -1,220 +1,280 @@
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
 from django.db import transaction
-from core.models import LearningTrack, Subject, Topic, Resource
+
+from core.models import CatalogVersion, LearningTrack, Subject, Topic, Resource
+from core.services.resource_search import reindex_resources, search_resources
+from core.services.roadmap_cache import normalize_goal_title
 
 
 # ==================================================
-# CORE SAFE CREATOR
+# CATALOG FILES
 # ==================================================
 
-def safe_get_or_create(model, **kwargs):
-    obj, _ = model.objects.get_or_create(**kwargs)
-    return obj
+# one JSON file per subject:
+# {
+#   "track": "Computer Science",
+#   "subject": "Web Development",
+#   "keywords": ["web", "frontend", ...],
+#   "topics": { "HTML": "desc", ... },
+#   "resources": [{"topic": "HTML", "title": "...", "url": "...", "type": "video", "description": "..."}]
+# }
+CATALOG_DIR = Path(getattr(
+    settings, "RESOURCE_CATALOG_DIR", Path(__file__).resolve().parent.parent / "catalog"
+))
 
+CATALOG_NAME = "resources"
 
-# ==================================================
-# UNIVERSAL SUBJECT SEEDER ENGINE
-# ==================================================
+# subjects per bulk seeding transaction
+SEED_BATCH = 50
 
-@transaction.atomic
-def seed_subject_resources(track_name, subject_name, topics_dict, resources_list):
+
+def catalog_files():
+    return sorted(CATALOG_DIR.glob("*.json"))
+
+
+def load_catalog():
     """
-    UNIVERSAL SEEDER ENGINE
-
-    track_name     -> "Computer Science", "Chemistry", "Electronics"
-    subject_name   -> "Web Development", "Organic Chemistry"
-    topics_dict    -> { "HTML": "desc", "CSS": "desc" }
-    resources_list -> [
-        ("HTML", "HTML Full Course", "url", "video", "short desc"),
-        ...
-    ]
+    Yields catalog entries one file at a time, so memory stays flat
+    however many subjects the catalog grows to.
     """
+    for path in catalog_files():
+        with open(path, encoding="utf-8") as f:
+            entry = json.load(f)
 
-    # 1. Track
-    track = safe_get_or_create(
-        LearningTrack,
-        name=track_name,
-        defaults={"description": f"{track_name} academic track"}
-    )
+        if not entry.get("track") or not entry.get("subject"):
+            print("Catalog error: missing track/subject in", path.name)
+            continue
 
-    # 2. Subject
-    subject = safe_get_or_create(
-        Subject,
-        track=track,
-        name=subject_name
-    )
+        entry.setdefault("keywords", [])
+        entry.setdefault("topics", {})
+        entry.setdefault("resources", [])
+        yield entry
 
-    # 3. Topics
-    topic_objects = {}
-    for name, desc in topics_dict.items():
-        topic, _ = Topic.objects.get_or_create(
-            subject=subject,
-            name=name,
-            defaults={"description": desc}
-        )
-        topic_objects[name] = topic
-
-    # 4. Resources
-    for topic_name, title, url, rtype, short_desc in resources_list:
-        Resource.objects.get_or_create(
-            topic=topic_objects[topic_name],
-            title=title,
-            defaults={
-                "url": url,
-                "type": rtype,
-                "short_description": short_desc,
-                "is_best": True
-            }
-        )
 
-    return subject
+@lru_cache(maxsize=1)
+def catalog_hash():
+    """
+    sha256 over the catalog files; seeding runs once per hash.
+    """
+    digest = hashlib.sha256()
+    for path in catalog_files():
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
 
 
 # ==================================================
-# DSA
+# VERSIONED BULK SEEDER
 # ==================================================
 
-def seed_dsa_resources():
-
-    topics = {
-        "Arrays": "Linear data structure storing elements",
-        "Linked Lists": "Dynamic node-based structure",
-        "Stacks": "LIFO structure",
-        "Queues": "FIFO structure",
-        "Trees": "Hierarchical structure",
-        "Graphs": "Network structure",
-        "Sorting Algorithms": "Sorting techniques",
-        "Searching Algorithms": "Searching techniques",
-        "Dynamic Programming": "Optimization techniques",
-        "Recursion & Backtracking": "Divide and conquer problems"
+@transaction.atomic
+def seed_catalog(entries):
+    """
+    Upserts tracks, subjects, topics and resources for the given
+    catalog entries with one bulk statement per model. Safe to run
+    repeatedly and from several workers at once.
+    """
+    track_names = {entry["track"] for entry in entries}
+    LearningTrack.objects.bulk_create(
+        [LearningTrack(name=name, description=f"{name} academic track") for name in track_names],
+        ignore_conflicts=True,
+    )
+    tracks = dict(LearningTrack.objects.filter(name__in=track_names).values_list("name", "id"))
+
+    Subject.objects.bulk_create(
+        [Subject(track_id=tracks[entry["track"]], name=entry["subject"]) for entry in entries],
+        ignore_conflicts=True,
+    )
+    subjects = {
+        (track_id, name): pk
+        for pk, track_id, name in Subject.objects
+        .filter(track_id__in=tracks.values(), name__in={entry["subject"] for entry in entries})
+        .values_list("id", "track_id", "name")
     }
 
-    resources = [
-        ("Arrays", "Arrays – GeeksforGeeks", "https://www.geeksforgeeks.org/array-data-structure/", "article",
-         "Learn fundamentals of arrays and operations."),
-        ("Arrays", "Arrays – freeCodeCamp", "https://www.youtube.com/watch?v=QJNwK2uJyGs", "video",
-         "Full beginner friendly array course."),
+    subject_ids = [subjects[(tracks[entry["track"]], entry["subject"])] for entry in entries]
 
-        ("Linked Lists", "Linked List – freeCodeCamp", "https://www.youtube.com/watch?v=Hj_rA0dhr2I", "video",
-         "Complete linked list mastery."),
+    topics = [
+        Topic(subject_id=subject_id, name=name, description=desc)
+        for entry, subject_id in zip(entries, subject_ids)
+        for name, desc in entry["topics"].items()
+    ]
+    Topic.objects.bulk_create(
+        topics,
+        update_conflicts=True,
+        unique_fields=["subject", "name"],
+        update_fields=["description"],
+        batch_size=500,
+    )
+    topic_ids = {
+        (subject_id, name): pk
+        for pk, subject_id, name in Topic.objects
+        .filter(subject_id__in=subject_ids)
+        .values_list("id", "subject_id", "name")
+    }
 
-        ("Trees", "Trees – freeCodeCamp", "https://www.youtube.com/watch?v=oSWTXtMglKE", "video",
-         "Binary trees, BSTs, traversals explained."),
+    resources = [
+        Resource(
+            topic_id=topic_ids[(subject_id, item["topic"])],
+            title=item["title"],
+            url=item["url"],
+            type=item["type"],
+            short_description=item.get("description", ""),
+            is_best=True,
+        )
+        for entry, subject_id in zip(entries, subject_ids)
+        for item in entry["resources"]
+        if (subject_id, item["topic"]) in topic_ids
+    ]
+    Resource.objects.bulk_create(
+        resources,
+        update_conflicts=True,
+        unique_fields=["topic", "title"],
+        update_fields=["url", "type", "short_description", "is_best"],
+        batch_size=500,
+    )
 
-        ("Graphs", "Graph Theory – Abdul Bari", "https://www.youtube.com/watch?v=pcKY4hjDrxk", "video",
-         "Deep conceptual understanding of graphs."),
+    # bulk_create sends no signals; refresh the search index here
+    reindex_resources(subject_ids, by="subject")
 
-        ("Dynamic Programming", "DP – Aditya Verma", "https://www.youtube.com/watch?v=nqowUJzG-iM", "video",
-         "Master problem solving patterns."),
+    return len(resources)
 
-        ("Arrays", "DSA Notes PDF", "https://www.vssut.ac.in/lecture_notes/lecture1423904941.pdf", "book",
-         "Printable structured DSA notes."),
-    ]
 
-    return seed_subject_resources(
-        "Computer Science",
-        "Data Structures and Algorithms",
-        topics,
-        resources
-    )
+def _seed_all():
+    seeded = 0
+    batch = []
 
+    for entry in load_catalog():
+        batch.append(entry)
+        if len(batch) >= SEED_BATCH:
+            seeded += seed_catalog(batch)
+            batch = []
 
-# ==================================================
-# WEB DEVELOPMENT
-# ==================================================
+    if batch:
+        seeded += seed_catalog(batch)
 
-def seed_web_resources():
+    return seeded
 
-    topics = {
-        "HTML": "Structure of web pages",
-        "CSS": "Styling and layouts",
-        "JavaScript": "Web interactivity",
-        "Git & GitHub": "Version control",
-        "React": "Frontend framework",
-        "Backend Basics": "Server-side development",
-        "Databases": "Data storage systems"
-    }
 
-    resources = [
-        ("HTML", "HTML Full Course – freeCodeCamp", "https://www.youtube.com/watch?v=pQN-pnXPaVg", "video",
-         "Learn to build website structure."),
-        ("CSS", "CSS Crash Course – Traversy", "https://www.youtube.com/watch?v=yfoY53QXEnI", "video",
-         "Modern styling techniques."),
-        ("JavaScript", "JavaScript Full Course – freeCodeCamp", "https://www.youtube.com/watch?v=jS4aFq5-91M", "video",
-         "Make websites interactive."),
+_seeded_hash = None
 
-        ("Git & GitHub", "Git & GitHub – freeCodeCamp", "https://www.youtube.com/watch?v=RGOj5yH7evk", "video",
-         "Professional version control skills."),
 
-        ("React", "React Full Course – freeCodeCamp", "https://www.youtube.com/watch?v=bMknfKXIFA8", "video",
-         "Frontend development with React."),
+def ensure_catalog_seeded(force=False):
+    """
+    Seeds the catalog if this version hasn't been seeded yet. After the
+    first check per process this is a no-op without queries.
+    Returns True if it seeded.
+    """
+    global _seeded_hash
 
-        ("Databases", "SQL Tutorial – freeCodeCamp", "https://www.youtube.com/watch?v=HXV3zeQKqGY", "video",
-         "Databases for web applications."),
+    version = catalog_hash()
+    if _seeded_hash == version and not force:
+        return False
 
-        ("HTML", "MDN Web Docs", "https://developer.mozilla.org/", "docs",
-         "Official web development documentation."),
-    ]
+    seeded = CatalogVersion.objects.filter(name=CATALOG_NAME, content_hash=version).exists()
 
-    return seed_subject_resources(
-        "Computer Science",
-        "Web Development",
-        topics,
-        resources
-    )
+    if force or not seeded:
+        _seed_all()
+        CatalogVersion.objects.bulk_create(
+            [CatalogVersion(name=CATALOG_NAME, content_hash=version)],
+            update_conflicts=True,
+            unique_fields=["name"],
+            update_fields=["content_hash", "seeded_at"],
+        )
+
+    _seeded_hash = version
+    return force or not seeded
 
 
 # ==================================================
-# SQL / DATABASES
+# GOAL -> SUBJECT CLASSIFIER
 # ==================================================
 
-def seed_sql_resources():
+def _trie_pattern(keywords):
+    """
+    One regex for all keywords, factored as a trie ("web(?:site)?"),
+    so matching costs O(title length) however many keywords there are.
+    """
+    trie = {}
+    for word in keywords:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
 
-    topics = {
-        "SQL Basics": "Foundations of SQL",
-        "Queries": "Filtering and aggregations",
-        "Joins": "Multi-table operations",
-        "Indexes": "Performance optimization",
-        "Practice": "Hands-on problem solving"
-    }
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
 
-    resources = [
-        ("SQL Basics", "SQL Full Course – freeCodeCamp", "https://www.youtube.com/watch?v=HXV3zeQKqGY", "video",
-         "Complete beginner SQL guide."),
-        ("Queries", "W3Schools SQL", "https://www.w3schools.com/sql/", "docs",
-         "Interactive SQL reference."),
-        ("Practice", "LeetCode SQL", "https://leetcode.com/studyplan/top-sql-50/", "practice",
-         "Interview level SQL problems."),
-        ("Practice", "HackerRank SQL", "https://www.hackerrank.com/domains/sql", "practice",
-         "Structured SQL practice path."),
-    ]
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
 
-    return seed_subject_resources(
-        "Computer Science",
-        "SQL & Databases",
-        topics,
-        resources
-    )
+    return emit(trie)
 
 
-# ==================================================
-# AUTO SEEDER (BASED ON USER GOAL)
-# ==================================================
+@lru_cache(maxsize=1)
+def _matcher():
+    owners = {}
+    for entry in load_catalog():
+        for keyword in entry["keywords"]:
+            keyword = " ".join(keyword.lower().split())
+            if keyword:
+                owners.setdefault(keyword, []).append((entry["track"], entry["subject"]))
+
+    if not owners:
+        return None, owners
+
+    # keywords match from the start of a word ("web" in "webdev", not "cobweb")
+    pattern = re.compile(r"(?<![a-z0-9])" + _trie_pattern(owners))
+    return pattern, owners
+
+
+def classify_goal(goal_title):
+    """
+    (track, subject) of the catalog subject whose keywords best match
+    the title, in one pass over it. Longer keyword matches weigh more.
+    None if nothing matches.
+    """
+    pattern, owners = _matcher()
+    if pattern is None:
+        return None
 
-def seed_resources_by_goal(goal_title):
+    title = " ".join(goal_title.lower().split())
+    scores = {}
 
-    title = goal_title.lower()
+    for match in pattern.finditer(title):
+        for owner in owners.get(match.group(), []):
+            scores[owner] = scores.get(owner, 0) + len(match.group())
 
-    if "dsa" in title or "data structure" in title:
-        return seed_dsa_resources()
+    if not scores:
+        return None
 
-    if "web" in title or "frontend" in title or "website" in title:
-        return seed_web_resources()
+    return max(scores, key=scores.get)
 
-    if "sql" in title or "database" in title:
-        return seed_sql_resources()
 
-    # Future plug-and-play
-    # if "chem" in title:
-    #     return seed_chemistry_resources()
+# ==================================================
+# GOAL -> RESOURCES
+# ==================================================
+
+def resources_for_goal(goal_title, limit=12):
+    """
+    Resources ranked against the goal title (synonyms expanded, so
+    "DSA" finds "Data Structures and Algorithms"), plus everything in
+    the catalog subject the title classifies into.
+    """
+    subject = classify_goal(goal_title)
 
-    return None
+    return search_resources(
+        normalize_goal_title(goal_title),
+        subject=subject[1] if subject else None,
+        limit=limit,
+    )
@@ -0,0 +1,240 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import RoadmapCache
+from core.services.goal_index import find_similar, index_goal, pack_hashes, title_hashes
+from core.services.groq import generate_goal_solution, is_ai_error
+from core.services.metrics import get_totals, incr
+
+# -------------------------------------------------
+# ROADMAP CACHE CONFIG
+# -------------------------------------------------
+
+MEMORY_SIZE = getattr(settings, "ROADMAP_CACHE_SIZE", 512)
+TTL = timedelta(days=getattr(settings, "ROADMAP_CACHE_TTL_DAYS", 30))
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "in", "on", "for", "to", "with",
+    "how", "i", "want", "my", "me", "learn", "learning", "study", "studying",
+    "get", "become", "good", "better", "at", "about", "into", "using", "use",
+}
+
+# token -> canonical tokens
+SYNONYMS = {
+    "dsa": "data structures algorithms",
+    "ds": "data structures",
+    "algo": "algorithms",
+    "algos": "algorithms",
+    "algorithm": "algorithms",
+    "structure": "structures",
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "dl": "deep learning",
+    "dev": "development",
+    "develop": "development",
+    "developer": "development",
+    "webdev": "web development",
+    "frontend": "front end",
+    "backend": "back end",
+    "cp": "competitive programming",
+    "db": "database",
+    "dbms": "database management systems",
+    "oop": "object oriented programming",
+    "oops": "object oriented programming",
+    "os": "operating systems",
+    "cn": "computer networks",
+}
+
+# words that one synonym expands into belong together: a title with
+# "data structures" may lack "algorithms" and still mean "DSA"
+SYNONYM_GROUPS = [
+    frozenset(tokens.split()) for tokens in set(SYNONYMS.values()) if " " in tokens
+]
+
+METRIC_MEMORY_HIT = "roadmap_cache.hit.memory"
+METRIC_DB_HIT = "roadmap_cache.hit.db"
+METRIC_SIMILAR_HIT = "roadmap_cache.hit.similar"
+METRIC_MISS = "roadmap_cache.miss"
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+# -------------------------------------------------
+# NORMALIZATION
+# -------------------------------------------------
+
+def normalize_goal_title(title):
+    """
+    "Learn DSA!" and "data structures & algorithms" both become
+    "algorithms data structures".
+    """
+    words = re.sub(r"[^a-z0-9+#]+", " ", title.lower()).split()
+
+    tokens = set()
+    for word in words:
+        for token in SYNONYMS.get(word, word).split():
+            if token not in STOPWORDS:
+                tokens.add(token)
+
+    return " ".join(sorted(tokens))
+
+
+def cache_key(normalized):
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+# -------------------------------------------------
+# MEMORY TIER (LRU + TTL)
+# -------------------------------------------------
+
+def _memory_get(key):
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+
+        content, expires_at = entry
+        if expires_at <= timezone.now():
+            del _memory[key]
+            return None
+
+        _memory.move_to_end(key)
+        return content
+
+
+def _memory_set(key, content, expires_at):
+    with _lock:
+        _memory[key] = (content, expires_at)
+        _memory.move_to_end(key)
+
+        while len(_memory) > MEMORY_SIZE:
+            _memory.popitem(last=False)
+
+
+# -------------------------------------------------
+# LOOKUP
+# -------------------------------------------------
+
+def get_cached_roadmap(title):
+    """
+    The cached roadmap for this goal, or None. Memory first, then the
+    RoadmapCache table, which survives restarts and is shared by workers.
+    """
+    normalized = normalize_goal_title(title)
+    if not normalized:
+        return None
+
+    key = cache_key(normalized)
+
+    content = _memory_get(key)
+    if content is not None:
+        incr(METRIC_MEMORY_HIT)
+        return content
+
+    row = _load(key)
+    if row is not None:
+        incr(METRIC_DB_HIT)
+        _memory_set(key, row.content, row.created_at + TTL)
+        return row.content
+
+    # paraphrases ("DSA using Java" / "learn data structures in java")
+    match = find_similar(normalized, groups=SYNONYM_GROUPS)
+    row = _load(match[0]) if match else None
+    if row is not None:
+        incr(METRIC_SIMILAR_HIT)
+        # remembered under this title's key, so the next lookup is exact
+        _memory_set(key, row.content, row.created_at + TTL)
+        return row.content
+
+    incr(METRIC_MISS)
+    return None
+
+
+def _load(key):
+    row = (
+        RoadmapCache.objects
+        .filter(key=key, created_at__gt=timezone.now() - TTL)
+        .only("content", "created_at")
+        .first()
+    )
+    if row is not None:
+        RoadmapCache.objects.filter(pk=row.pk).update(
+            hits=F("hits") + 1,
+            last_used_at=timezone.now(),
+        )
+    return row
+
+
+def store_roadmap(title, content):
+    normalized = normalize_goal_title(title)
+    if not normalized or is_ai_error(content):
+        return
+
+    key = cache_key(normalized)
+    now = timezone.now()
+    hashes = title_hashes(normalized)
+
+    # one INSERT ... ON CONFLICT statement, safe from concurrent workers
+    RoadmapCache.objects.bulk_create(
+        [RoadmapCache(
+            key=key,
+            normalized_title=normalized[:255],
+            title=title[:200],
+            band_hashes=pack_hashes(hashes),
+            content=content,
+            created_at=now,
+            last_used_at=now,
+        )],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["title", "band_hashes", "content", "created_at", "last_used_at"],
+    )
+    _memory_set(key, content, now + TTL)
+    index_goal(key, normalized, hashes)
+
+
+def cached_goal_solution(title, user=None):
+    """
+    generate_goal_solution with the shared cache in front of it.
+    """
+    content = get_cached_roadmap(title)
+    if content is not None:
+        return content
+
+    content = generate_goal_solution(title, user=user)
+    store_roadmap(title, content)
+    return content
+
+
+# -------------------------------------------------
+# MAINTENANCE
+# -------------------------------------------------
+
+def purge_expired():
+    deleted, _ = RoadmapCache.objects.filter(created_at__lte=timezone.now() - TTL).delete()
+    return deleted
+
+
+def hit_rate(days=7):
+    hit_metrics = [METRIC_MEMORY_HIT, METRIC_DB_HIT, METRIC_SIMILAR_HIT]
+
+    totals = get_totals(hit_metrics + [METRIC_MISS], days)
+    lookups = sum(totals.values())
+    hits = sum(totals[name] for name in hit_metrics)
+
+    return {
+        **totals,
+        "lookups": lookups,
+        "hit_rate": hits / lookups if lookups else 0.0,
+    }
@@ -0,0 +1,213 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from core.models import DailyActivity, JobWatermark, LeaderboardRollup, StudySession
+from core.services.upserts import increment
+from core.services.watermarks import set_watermark
+
+# -------------------------------------------------
+# ROLLUP CONFIG
+# -------------------------------------------------
+
+STUDY_XP_PER_MINUTE = 1
+
+TOP_K = 100
+CACHE_TTL = 60 * 60
+BATCH_SIZE = 2000
+
+WINDOWS = ("week", "month")
+
+# the default cache is per process, so cached boards are keyed by a
+# DB-stored version that every worker sees (see heatmap_version)
+WATERMARK = "leaderboard"
+
+
+def window_start(window, day):
+    if window == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def platform_board(slug):
+    return f"platform:{slug}"
+
+
+def track_board(track_id):
+    return f"track:{track_id}"
+
+
+def _bump_boards(user_id, day, boards, score):
+    if score <= 0:
+        return
+
+    for window in WINDOWS:
+        start = window_start(window, day)
+
+        for board in boards:
+            increment(
+                LeaderboardRollup,
+                {"user_id": user_id, "window": window, "period_start": start, "board": board},
+                {"score": score},
+            )
+            invalidate_top(window, start, board)
+
+
+# -------------------------------------------------
+# INGESTION
+# -------------------------------------------------
+
+def record_platform_activity(account, platform, xp=0, problems=0, commits=0, day=None):
+    """
+    Adds one sync's gains to today's DailyActivity row and to the
+    weekly/monthly rollups of the "all" and per-platform boards.
+    """
+    day = day or timezone.localdate()
+
+    if xp <= 0 and problems <= 0 and commits <= 0:
+        return
+
+    increment(
+        DailyActivity,
+        {"account_id": account.id, "date": day},
+        {
+            "xp": max(0, xp),
+            "problems_solved": max(0, problems),
+            "commits": max(0, commits),
+        },
+        values={"updated_at": timezone.now()},
+    )
+
+    _bump_boards(
+        account.user_id,
+        day,
+        ["all", platform_board(platform)],
+        xp,
+    )
+
+
+def record_study_session(session):
+    """
+    Study minutes count towards the "all" board and the session's track.
+    """
+    boards = ["all"]
+
+    if session.topic_id:
+        boards.append(track_board(session.topic.subject.track_id))
+
+    _bump_boards(
+        session.user_id,
+        session.study_date,
+        boards,
+        session.duration_minutes * STUDY_XP_PER_MINUTE,
+    )
+
+
+# -------------------------------------------------
+# CACHED TOP-K READS
+# -------------------------------------------------
+
+def _top_key(window, start, board):
+    return f"leaderboard:top:{window}:{start.isoformat()}:{board}:{board_version(window, start, board)}"
+
+
+def _board_watermark(window, start, board):
+    return f"{WATERMARK}:{window}:{start.isoformat()}:{board}"
+
+
+def board_version(window, start, board):
+    """
+    Changes whenever the board's rows can have changed: on every
+    ingestion that touches it and on a full rebuild.
+    """
+    stamps = JobWatermark.objects.filter(
+        name__in=[WATERMARK, _board_watermark(window, start, board)]
+    ).values_list("value", flat=True)
+
+    return max((int(v.timestamp() * 1_000_000) for v in stamps), default=0)
+
+
+def invalidate_top(window, start, board):
+    set_watermark(_board_watermark(window, start, board), timezone.now())
+
+
+def get_top(window, board, day=None):
+    """
+    Top-K rows of one window/board, cached until the next ingestion
+    touches that board. A hit is one watermark read, a miss one more
+    indexed range read.
+    """
+    start = window_start(window, day or timezone.localdate())
+    key = _top_key(window, start, board)
+
+    rows = cache.get(key)
+    if rows is None:
+        rows = list(
+            LeaderboardRollup.objects
+            .filter(window=window, period_start=start, board=board)
+            .order_by("-score", "user_id")
+            .values("user_id", "user__username", "score")[:TOP_K]
+        )
+        cache.set(key, rows, CACHE_TTL)
+
+    return rows
+
+
+# -------------------------------------------------
+# FULL BACKFILL
+# -------------------------------------------------
+
+def rebuild_rollups():
+    """
+    Recomputes every rollup from DailyActivity and StudySession.
+    Only needed once for existing history or after changing the rules.
+    """
+    totals = {}
+
+    def add(user_id, window, start, board, score):
+        key = (user_id, window, start, board)
+        totals[key] = totals.get(key, 0) + (score or 0)
+
+    for window, trunc in (("week", TruncWeek), ("month", TruncMonth)):
+        platform_rows = (
+            DailyActivity.objects
+            .annotate(period=trunc("date"))
+            .values("account__user_id", "account__platform__slug", "period")
+            .annotate(score=Sum("xp"))
+        )
+        for row in platform_rows.iterator():
+            user_id = row["account__user_id"]
+            add(user_id, window, row["period"], "all", row["score"])
+            add(user_id, window, row["period"], platform_board(row["account__platform__slug"]), row["score"])
+
+        study_rows = (
+            StudySession.objects
+            .annotate(period=trunc("study_date"))
+            .values("user_id", "topic__subject__track_id", "period")
+            .annotate(minutes=Sum("duration_minutes"))
+        )
+        for row in study_rows.iterator():
+            score = row["minutes"] * STUDY_XP_PER_MINUTE
+            add(row["user_id"], window, row["period"], "all", score)
+            if row["topic__subject__track_id"]:
+                add(row["user_id"], window, row["period"], track_board(row["topic__subject__track_id"]), score)
+
+    with transaction.atomic():
+        LeaderboardRollup.objects.all().delete()
+        LeaderboardRollup.objects.bulk_create(
+            [
+                LeaderboardRollup(user_id=user_id, window=window, period_start=start, board=board, score=score)
+                for (user_id, window, start, board), score in totals.items()
+                if score > 0
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    # every cached board, in every worker, is stale now
+    set_watermark(WATERMARK, timezone.now())
+
+    return len(totals)
@@ -0,0 +1,118 @@
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from core.models import AIInflight
+from core.services.ai_limits import SLOT_WAIT
+from core.services.ai_router import longest_chain
+from core.services.metrics import incr
+
+# -------------------------------------------------
+# SINGLE-FLIGHT CONFIG
+# -------------------------------------------------
+
+# a lease older than this belongs to a dead worker: the leader may run a
+# whole fallback chain, every hop timing out after waiting for a slot
+_CHAIN_SECONDS, _CHAIN_HOPS = longest_chain()
+LEASE_TIMEOUT = timedelta(seconds=_CHAIN_SECONDS + _CHAIN_HOPS * SLOT_WAIT + 15)
+
+# late arrivals within this window still get the shared result
+RESULT_TTL = timedelta(seconds=10)
+
+POLL_INTERVAL = 0.25
+
+# finished / abandoned rows are swept after this long
+SWEEP_AFTER = timedelta(minutes=5)
+
+_local = {}
+_lock = threading.Lock()
+
+
+# -------------------------------------------------
+# COALESCING
+# -------------------------------------------------
+
+def single_flight(key, fn, shareable=None):
+    """
+    Runs fn() once for all concurrent callers with the same key.
+
+    Threads of this process wait on the leader's future; other worker
+    processes find the leader's AIInflight lease and poll for its result.
+    Results rejected by `shareable` (e.g. errors) are handed to the
+    threads already waiting, but not published to other processes.
+    """
+    if not getattr(settings, "AI_COALESCE", True):
+        return fn()
+
+    with _lock:
+        future = _local.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _local[key] = future
+
+    if not leader:
+        incr("single_flight.shared.thread")
+        return future.result()
+
+    try:
+        result = _run_across_processes(key, fn, shareable)
+        future.set_result(result)
+        return result
+
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+
+    finally:
+        with _lock:
+            _local.pop(key, None)
+
+
+def _run_across_processes(key, fn, shareable):
+    while True:
+        now = timezone.now()
+        row = AIInflight.objects.filter(key=key).values("started_at", "result", "finished_at").first()
+
+        if row is None:
+            try:
+                with transaction.atomic():
+                    AIInflight.objects.create(key=key, started_at=now)
+                break
+            except IntegrityError:
+                continue
+
+        if row["result"] is not None and row["finished_at"] > now - RESULT_TTL:
+            incr("single_flight.shared.process")
+            return row["result"]
+
+        if row["result"] is None and row["started_at"] > now - LEASE_TIMEOUT:
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        # expired result or abandoned lease: take it over
+        if AIInflight.objects.filter(key=key, started_at=row["started_at"]).update(
+            started_at=now, result=None, finished_at=None
+        ):
+            break
+
+    leases = AIInflight.objects.filter(key=key, started_at=now)
+
+    try:
+        result = fn()
+    except BaseException:
+        leases.delete()
+        raise
+
+    if shareable is None or shareable(result):
+        leases.update(result=result, finished_at=timezone.now())
+    else:
+        leases.delete()
+
+    AIInflight.objects.filter(started_at__lt=now - SWEEP_AFTER).delete()
+    return result
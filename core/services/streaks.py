@@ -0,0 +1,149 @@
+from datetime import date, timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from core.models import StudyStreak, UserStats
+
+# -------------------------------------------------
+# STREAK CONFIG
+# -------------------------------------------------
+
+BATCH_SIZE = 2000
+
+# Gaps and islands (SQLite dialect): consecutive days minus their row number form a
+# constant, so each island (streak) is one GROUP BY bucket.
+STREAKS_SQL = """
+WITH active AS (
+    SELECT user_id, study_date AS day
+    FROM core_studysession
+    UNION
+    SELECT user_id, DATE(completed_at, %s) AS day
+    FROM core_task
+    WHERE completed_at IS NOT NULL
+),
+islands AS (
+    SELECT
+        user_id,
+        day,
+        julianday(day) - ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day) AS grp
+    FROM active
+),
+runs AS (
+    SELECT user_id, MAX(day) AS last_day, COUNT(*) AS length
+    FROM islands
+    GROUP BY user_id, grp
+)
+SELECT
+    user_id,
+    MAX(CASE WHEN last_day >= %s THEN length ELSE 0 END) AS current_streak,
+    MAX(length) AS longest_streak,
+    MAX(last_day) AS last_active
+FROM runs
+GROUP BY user_id
+"""
+
+
+# -------------------------------------------------
+# COMPUTE
+# -------------------------------------------------
+
+def compute_streaks(today=None):
+    """
+    {user_id: (current, longest, last_active)} for every user with at
+    least one study session or completed task, in one query.
+
+    A streak is still current if its last day is today or yesterday.
+    """
+    today = today or timezone.localdate()
+    yesterday = today - timedelta(days=1)
+
+    # task completions are stored in UTC; bucket them by local day
+    offset = timezone.localtime().utcoffset()
+    modifier = f"{int(offset.total_seconds() // 60):+d} minutes"
+
+    with connection.cursor() as cursor:
+        cursor.execute(STREAKS_SQL, [modifier, yesterday.isoformat()])
+
+        return {
+            user_id: (current, longest, _as_date(last_active))
+            for user_id, current, longest, last_active in cursor.fetchall()
+        }
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+
+# -------------------------------------------------
+# APPLY
+# -------------------------------------------------
+
+def recompute_streaks(today=None):
+    """
+    Rewrites StudyStreak and UserStats streak columns from the activity
+    log. Inactive users drop to a current streak of 0. Longest streaks
+    never shrink, since older completions may predate the log.
+    """
+    results = compute_streaks(today)
+
+    streaks_changed = _apply_study_streaks(results)
+    stats_changed = _apply_user_stats(results)
+
+    return streaks_changed, stats_changed
+
+
+def _apply_study_streaks(results):
+    fields = ["current_streak", "longest_streak", "last_active"]
+
+    # materialised first: SQLite gives no isolation between a running
+    # cursor and writes to the same table
+    rows = list(StudyStreak.objects.values_list("id", "user_id", *fields))
+
+    changed = []
+    for pk, user_id, *stored in rows:
+        current, longest, last_active = results.get(user_id, (0, 0, stored[2]))
+        longest = max(longest, stored[1])
+
+        if tuple(stored) != (current, longest, last_active):
+            changed.append(StudyStreak(
+                id=pk,
+                current_streak=current,
+                longest_streak=longest,
+                last_active=last_active,
+            ))
+
+    StudyStreak.objects.bulk_update(changed, fields, batch_size=BATCH_SIZE)
+
+    existing = {user_id for _, user_id, *_ in rows}
+    missing = [
+        StudyStreak(
+            user_id=user_id,
+            current_streak=current,
+            longest_streak=longest,
+            last_active=last_active,
+        )
+        for user_id, (current, longest, last_active) in results.items()
+        if user_id not in existing
+    ]
+    StudyStreak.objects.bulk_create(missing, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+    return len(changed) + len(missing)
+
+
+def _apply_user_stats(results):
+    fields = ["current_streak", "longest_streak"]
+    rows = list(UserStats.objects.values_list("id", "user_id", *fields))
+
+    changed = []
+    for pk, user_id, *stored in rows:
+        current, longest, _ = results.get(user_id, (0, 0, None))
+        longest = max(longest, stored[1])
+
+        if tuple(stored) != (current, longest):
+            changed.append(UserStats(id=pk, current_streak=current, longest_streak=longest))
+
+    UserStats.objects.bulk_update(changed, fields, batch_size=BATCH_SIZE)
+    return len(changed)
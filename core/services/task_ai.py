@@ -1,22 +1,205 @@
-from core.services.groq import generate_goal_solution
+from django.conf import settings
 
-def generate_task_reply(task, history, user_message):
-    context = f"""
-You are a helpful study assistant.
+from core.models import Task, TaskMessage
+from core.services.background import run_in_background
+from core.services.groq import (
+    call_groq, generate_task_ai_reply, is_ai_error, stream_task_ai_reply
+)
+from core.services.task_material import index_task_material, relevant_chunks
 
-TASK:
-Title: {task.title}
-Subject: {task.custom_subject or task.subject}
-Type: {task.task_type}
+# -------------------------------------------------
+# CONTEXT CONFIG
+# -------------------------------------------------
 
-CHAT HISTORY:
-{history}
+# tokens for material excerpts + summary + recent turns + the new question
+TOKEN_BUDGET = getattr(settings, "TASK_CHAT_TOKEN_BUDGET", 3000)
 
-USER QUESTION:
-{user_message}
+# share of the budget the material excerpts may take
+MATERIAL_TOKEN_BUDGET = getattr(settings, "TASK_MATERIAL_TOKEN_BUDGET", 800)
 
-Respond clearly, step-by-step if needed.
-If assignment: guide more, don't just dump final answers unless asked.
+# newest turns always kept verbatim, never folded into the summary
+KEEP_VERBATIM = 6
+
+# at most this many unsummarized turns are read per request
+MAX_RECENT = 30
+
+# older unsummarized turns above this size trigger a summary refresh
+SUMMARY_TRIGGER_TOKENS = 800
+
+# turns folded per summary call, so one refresh stays a small prompt
+SUMMARY_BATCH_TOKENS = 3000
+SUMMARY_MAX_WORDS = 200
+
+ROLES = {"user": "user", "ai": "assistant"}
+SPEAKERS = {"user": "Student", "ai": "Assistant"}
+
+
+def estimate_tokens(text):
+    # ~4 characters per token, plus per-message overhead
+    return len(text) // 4 + 4
+
+
+# -------------------------------------------------
+# CONTEXT BUILDER
+# -------------------------------------------------
+
+def build_task_history(task, before=None, reserve=0):
+    """
+    Chat context for the next reply: the stored summary of older turns,
+    then as many recent turns verbatim as fit in the token budget.
+
+    `before` excludes the message being answered (and anything newer);
+    `reserve` tokens of the budget are kept for the new question.
+    Returns (history, needs_summary).
+    """
+    recent = TaskMessage.objects.filter(task=task, id__gt=task.chat_summary_upto, is_error=False)
+    if before is not None:
+        recent = recent.filter(id__lt=before)
+
+    recent = list(recent.order_by("-id").values("id", "sender", "content")[:MAX_RECENT + 1])
+
+    budget = TOKEN_BUDGET - reserve
+    history = []
+
+    if task.chat_summary:
+        summary = f"Summary of the earlier conversation:\n{task.chat_summary}"
+        budget -= estimate_tokens(summary)
+        history.append({"role": "system", "content": summary})
+
+    turns = []
+    dropped = len(recent) > MAX_RECENT
+    for message in recent[:MAX_RECENT]:
+        cost = estimate_tokens(message["content"])
+        if cost > budget:
+            dropped = True
+            break
+        budget -= cost
+        turns.append({"role": ROLES[message["sender"]], "content": message["content"]})
+
+    turns.reverse()
+
+    older_tokens = sum(estimate_tokens(m["content"]) for m in recent[KEEP_VERBATIM:])
+    needs_summary = dropped or older_tokens > SUMMARY_TRIGGER_TOKENS
+
+    return history + turns, needs_summary
+
+
+def build_material_context(task, question, lead=False):
+    """
+    The material chunks most relevant to the question, within
+    MATERIAL_TOKEN_BUDGET, as one system message (or nothing).
+    Materials not indexed yet are indexed in the background.
+    """
+    if not task.material:
+        return []
+
+    if not task.material_indexed:
+        run_in_background(f"task-material:{task.pk}", index_task_material, task.pk)
+        return []
+
+    excerpts = []
+    used = 0
+    for position, content in relevant_chunks(task, question, lead=lead):
+        cost = estimate_tokens(content)
+        if used + cost > MATERIAL_TOKEN_BUDGET:
+            break
+        used += cost
+        excerpts.append((position, content))
+
+    if not excerpts:
+        return []
+
+    text = "\n\n".join(f"[{position + 1}] {content}" for position, content in sorted(excerpts))
+    return [{
+        "role": "system",
+        "content": f"Relevant excerpts from the task material (quote them when useful):\n{text}"
+    }]
+
+
+def _prepare(task, user_message, before, lead=False):
+    material = build_material_context(task, user_message, lead=lead)
+    reserve = estimate_tokens(user_message) + sum(estimate_tokens(m["content"]) for m in material)
+
+    history, needs_summary = build_task_history(task, before, reserve=reserve)
+
+    if needs_summary:
+        run_in_background(f"task-summary:{task.pk}", refresh_chat_summary, task.pk)
+
+    return material + history
+
+
+def generate_task_reply(task, user_message, before=None, feature="task_chat", lead=False):
+    """
+    `lead` sends the opening material chunks when the message matches
+    none, for generic "help with this task" prompts.
+    """
+    history = _prepare(task, user_message, before, lead)
+    return generate_task_ai_reply(task, user_message, history=history, feature=feature)
+
+
+def stream_task_reply(task, user_message, before=None):
+    history = _prepare(task, user_message, before)
+    return stream_task_ai_reply(task, user_message, history=history)
+
+
+# -------------------------------------------------
+# ROLLING SUMMARY
+# -------------------------------------------------
+
+def refresh_chat_summary(task_id):
+    """
+    Folds the oldest unsummarized turns (outside the verbatim window)
+    into Task.chat_summary, one bounded batch per call.
+    """
+    task = Task.objects.only("user_id", "chat_summary", "chat_summary_upto").get(pk=task_id)
+
+    pending = TaskMessage.objects.filter(task_id=task_id, id__gt=task.chat_summary_upto, is_error=False)
+    keep = list(pending.order_by("-id").values_list("id", flat=True)[:KEEP_VERBATIM])
+    if len(keep) < KEEP_VERBATIM:
+        return
+
+    batch = []
+    used = 0
+    for message in pending.filter(id__lt=min(keep)).order_by("id").values("id", "sender", "content"):
+        cost = estimate_tokens(message["content"])
+        if batch and used + cost > SUMMARY_BATCH_TOKENS:
+            break
+        used += cost
+        batch.append(message)
+
+    if not batch:
+        return
+
+    transcript = "\n".join(
+        f"{SPEAKERS[m['sender']]}: {m['content'][:SUMMARY_BATCH_TOKENS * 4]}"
+        for m in batch
+    )
+
+    summary = call_groq([
+        {
+            "role": "system",
+            "content": "You keep a running summary of a tutoring chat. Keep facts, decisions, "
+                       "what the student already understood and open questions. Drop pleasantries."
+        },
+        {
+            "role": "user",
+            "content": f"""
+Current summary:
+{task.chat_summary or "(none)"}
+
+New turns:
+{transcript}
+
+Return the updated summary in under {SUMMARY_MAX_WORDS} words.
 """
+        }
+    ], temperature=0.2, feature="chat_summary", user=task.user_id)
+
+    if is_ai_error(summary):
+        return
 
-    return generate_goal_solution(context)
+    # only if no other refresh got there first
+    Task.objects.filter(pk=task_id, chat_summary_upto=task.chat_summary_upto).update(
+        chat_summary=summary.strip(),
+        chat_summary_upto=batch[-1]["id"],
+    )
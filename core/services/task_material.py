@@ -0,0 +1,122 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from core.models import Task, TaskMaterialChunk
+from core.services.fts import match_terms, search
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# MATERIAL INDEX CONFIG
+# -------------------------------------------------
+
+# words per chunk, and words shared with the previous chunk
+CHUNK_WORDS = 180
+CHUNK_OVERLAP = 30
+
+# very long uploads are only indexed up to this many chunks
+MAX_CHUNKS = getattr(settings, "TASK_MATERIAL_MAX_CHUNKS", 2000)
+
+TOP_K = getattr(settings, "TASK_MATERIAL_TOP_K", 4)
+
+SEARCH_SQL = """
+    SELECT c.position, c.content
+    FROM core_taskmaterialchunk_fts
+    JOIN core_taskmaterialchunk c ON c.id = core_taskmaterialchunk_fts.rowid
+    WHERE core_taskmaterialchunk_fts MATCH %s
+    ORDER BY bm25(core_taskmaterialchunk_fts, 1.0, 0.0)
+    LIMIT %s
+"""
+
+
+# -------------------------------------------------
+# INDEXING
+# -------------------------------------------------
+
+def chunk_text(text):
+    words = text.split()
+    step = CHUNK_WORDS - CHUNK_OVERLAP
+
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + CHUNK_WORDS]))
+        if start + CHUNK_WORDS >= len(words) or len(chunks) >= MAX_CHUNKS:
+            break
+
+    return chunks
+
+
+def index_task_material(task_id):
+    """
+    Extracts the task's uploaded material, splits it into overlapping
+    chunks and replaces the task's TaskMaterialChunk rows (the FTS
+    index follows through triggers). Returns the number of chunks, or
+    None if extraction failed; the task then stays unindexed, so the
+    next call retries.
+    """
+    task = Task.objects.only("material").get(pk=task_id)
+
+    text = ""
+    if task.material:
+        try:
+            # core.utils needs PyPDF2 / python-docx; keep them off the import path
+            from core.utils import extract_text
+
+            with task.material.open("rb") as file:
+                text = extract_text(file)
+        except Exception:
+            logger.exception("Material indexing failed for task %s", task_id)
+            return None
+
+    chunks = chunk_text(text)
+
+    with transaction.atomic():
+        TaskMaterialChunk.objects.filter(task_id=task_id).delete()
+        TaskMaterialChunk.objects.bulk_create(
+            [
+                TaskMaterialChunk(task_id=task_id, position=i, content=chunk)
+                for i, chunk in enumerate(chunks)
+            ],
+            batch_size=500,
+        )
+        Task.objects.filter(pk=task_id).update(material_indexed=True)
+
+    return len(chunks)
+
+
+def ensure_material_indexed(task):
+    """
+    Indexes the material inline if the upload job hasn't yet; for
+    callers already off the request thread.
+    """
+    if task.material and not task.material_indexed:
+        task.material_indexed = index_task_material(task.pk) is not None
+
+
+# -------------------------------------------------
+# RETRIEVAL
+# -------------------------------------------------
+
+def relevant_chunks(task, question, k=TOP_K, lead=False):
+    """
+    [(position, content)] of the k chunks that best match the question
+    (BM25), best first. With `lead`, falls back to the opening chunks
+    when nothing matches, e.g. for a generic "help me" prompt.
+    """
+    rows = []
+
+    terms = match_terms(question)
+    if terms:
+        rows = search(SEARCH_SQL, [f"task_id:{task.pk} AND ({terms})", k])
+
+    if not rows and lead:
+        rows = list(
+            TaskMaterialChunk.objects
+            .filter(task=task)
+            .order_by("position")
+            .values_list("position", "content")[:k]
+        )
+
+    return rows
@@ -0,0 +1,30 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+# -------------------------------------------------
+# INCREMENTAL UPSERTS
+# -------------------------------------------------
+
+def increment(model, lookup, deltas, values=None, update_values=None):
+    """
+    UPDATE ... SET col = col + delta, inserting the row on first touch.
+    `values` are plain assignments written alongside the increments;
+    `update_values` override them on UPDATE only, for expressions over
+    the existing row (e.g. Greatest(F("max_ms"), ...)).
+    """
+    values = values or {}
+    updates = {name: F(name) + value for name, value in deltas.items()}
+    updates.update(values)
+    updates.update(update_values or {})
+
+    rows = model.objects.filter(**lookup)
+    if rows.update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas, **values)
+    except IntegrityError:
+        # another writer inserted it first
+        rows.update(**updates)
@@ -0,0 +1,21 @@
+from core.models import JobWatermark
+
+
+# -------------------------------------------------
+# JOB WATERMARKS
+# -------------------------------------------------
+
+def get_watermark(name):
+    """
+    Last point in time a background job fully processed, or None.
+    """
+    return (
+        JobWatermark.objects
+        .filter(name=name)
+        .values_list("value", flat=True)
+        .first()
+    )
+
+
+def set_watermark(name, value):
+    JobWatermark.objects.update_or_create(name=name, defaults={"value": value})
@@ -0,0 +1,96 @@
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.models import UserStats
+from core.services.rollups import record_platform_activity
+from core.services.xp_history import snapshot_user
+
+# -------------------------------------------------
+# XP CONFIG
+# -------------------------------------------------
+
+XP_PER_LEVEL = 100
+
+# platform slug -> XP column on UserStats
+PLATFORM_XP_FIELDS = {
+    "github": "github_xp",
+    "leetcode": "leetcode_xp",
+    "gfg": "gfg_xp",
+    "codeforces": "codeforces_xp",
+    "hackerrank": "hackerrank_xp",
+}
+
+
+# -------------------------------------------------
+# SINGLE-WRITE COMMIT
+# -------------------------------------------------
+
+def commit_platform_xp(user, platform, xp, account=None, **fields):
+    """
+    Writes one platform's sync result to UserStats with a single UPDATE.
+
+    Only the columns that changed are written. total_xp and level are
+    recomputed in SQL from the stored platform columns, so two syncs of
+    different platforms for the same user cannot overwrite each other.
+
+    Today's XPSnapshot is upserted as a side effect of every real write.
+    When the syncing account is passed, the gains since its previous sync
+    are ingested into DailyActivity and the windowed leaderboards. The
+    first sync of an account only sets the baseline.
+
+    Returns the previous values of the changed columns, or None when
+    nothing changed and the write was skipped.
+    """
+    xp_field = PLATFORM_XP_FIELDS[platform]
+    values = {xp_field: xp, **fields}
+
+    stats, _ = UserStats.objects.get_or_create(user=user)
+
+    previous = {name: getattr(stats, name) for name in values}
+    changed = {
+        name: value
+        for name, value in values.items()
+        if previous[name] != value
+    }
+
+    if not changed:
+        return None
+
+    total_xp = Value(xp)
+    for name in PLATFORM_XP_FIELDS.values():
+        if name != xp_field:
+            total_xp = total_xp + F(name)
+
+    UserStats.objects.filter(pk=stats.pk).update(
+        **changed,
+        total_xp=total_xp,
+        level=Greatest(Value(1), total_xp / XP_PER_LEVEL),
+        last_updated=timezone.now(),
+    )
+
+    snapshot_user(stats.user_id)
+
+    previous = {name: previous[name] for name in changed}
+
+    if account is not None and account.last_synced:
+        _record_gains(account, platform, xp_field, previous, changed)
+
+    return previous
+
+
+def _record_gains(account, platform, xp_field, previous, changed):
+    def gain(name):
+        if name not in changed:
+            return 0
+        return max(0, (changed[name] or 0) - (previous[name] or 0))
+
+    problems = sum(gain(name) for name in changed if name.endswith("_solved"))
+
+    record_platform_activity(
+        account,
+        platform,
+        xp=gain(xp_field),
+        problems=problems,
+        commits=gain("total_commits"),
+    )
@@ -0,0 +1,139 @@
+from datetime import timedelta
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber, TruncWeek
+from django.utils import timezone
+
+from core.models import UserStats, XPSnapshot
+
+# -------------------------------------------------
+# SNAPSHOT CONFIG
+# -------------------------------------------------
+
+SNAPSHOT_FIELDS = [
+    "github_xp",
+    "leetcode_xp",
+    "gfg_xp",
+    "codeforces_xp",
+    "hackerrank_xp",
+    "total_xp",
+]
+
+DAILY_RETENTION_DAYS = 90
+BATCH_SIZE = 1000
+
+
+# -------------------------------------------------
+# UPSERT
+# -------------------------------------------------
+
+def upsert_snapshots(snapshots):
+    """
+    Bulk upsert of XPSnapshot rows on (user, date).
+    """
+    XPSnapshot.objects.bulk_create(
+        snapshots,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["user", "date"],
+        update_fields=SNAPSHOT_FIELDS,
+    )
+
+
+def _snapshot_from_row(row, day):
+    return XPSnapshot(
+        user_id=row["user_id"],
+        date=day,
+        **{name: row[name] for name in SNAPSHOT_FIELDS},
+    )
+
+
+def snapshot_user(user_id):
+    """
+    Records today's XP for one user. Called after every sync commit.
+    """
+    row = (
+        UserStats.objects
+        .filter(user_id=user_id)
+        .values("user_id", *SNAPSHOT_FIELDS)
+        .first()
+    )
+
+    if row:
+        upsert_snapshots([_snapshot_from_row(row, timezone.localdate())])
+
+
+def snapshot_all_users():
+    """
+    Nightly pass: today's snapshot for every user, written in batches.
+    """
+    today = timezone.localdate()
+    rows = UserStats.objects.values("user_id", *SNAPSHOT_FIELDS)
+
+    batch = []
+    written = 0
+
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(_snapshot_from_row(row, today))
+
+        if len(batch) >= BATCH_SIZE:
+            upsert_snapshots(batch)
+            written += len(batch)
+            batch = []
+
+    if batch:
+        upsert_snapshots(batch)
+        written += len(batch)
+
+    return written
+
+
+# -------------------------------------------------
+# RETENTION / DOWNSAMPLING
+# -------------------------------------------------
+
+def downsample_snapshots():
+    """
+    Keeps daily rows for the last 90 days. Older rows are reduced to one
+    per user per week (the latest day of that week).
+    """
+    cutoff = timezone.localdate() - timedelta(days=DAILY_RETENTION_DAYS)
+
+    stale_ids = list(
+        XPSnapshot.objects
+        .filter(date__lt=cutoff)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=[F("user_id"), TruncWeek("date")],
+                order_by=F("date").desc(),
+            )
+        )
+        .filter(position__gt=1)
+        .values_list("id", flat=True)
+    )
+
+    deleted = 0
+    for i in range(0, len(stale_ids), BATCH_SIZE):
+        chunk = stale_ids[i:i + BATCH_SIZE]
+        deleted += XPSnapshot.objects.filter(id__in=chunk).delete()[0]
+
+    return deleted
+
+
+# -------------------------------------------------
+# READ
+# -------------------------------------------------
+
+def get_xp_series(user, days=365):
+    """
+    A user's XP series as plain dicts. One range scan on (user, date).
+    """
+    since = timezone.localdate() - timedelta(days=days)
+
+    return list(
+        XPSnapshot.objects
+        .filter(user=user, date__gte=since)
+        .order_by("date")
+        .values("date", *SNAPSHOT_FIELDS)
+    )
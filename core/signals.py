@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Resource, Subject, Topic
+from core.services.resource_search import reindex_resources, remove_resources
+
+
+# ==================================================
+# RESOURCE SEARCH INDEX
+# ==================================================
+
+@receiver(post_save, sender=Resource)
+def index_resource(sender, instance, **kwargs):
+    reindex_resources([instance.pk])
+
+
+@receiver(post_delete, sender=Resource)
+def unindex_resource(sender, instance, **kwargs):
+    remove_resources([instance.pk])
+
+
+@receiver(post_save, sender=Topic)
+def reindex_topic_resources(sender, instance, created, **kwargs):
+    # a new topic has no resources yet
+    if not created:
+        reindex_resources([instance.pk], by="topic")
+
+
+@receiver(post_save, sender=Subject)
+def reindex_subject_resources(sender, instance, created, **kwargs):
+    if not created:
+        reindex_resources([instance.pk], by="subject")
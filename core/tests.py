@@ -1,3 +1,32 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from core.services.goal_index import GoalIndex
+from core.services.roadmap_cache import SYNONYM_GROUPS, cache_key, normalize_goal_title
+
+
+class SimilarGoalTests(SimpleTestCase):
+    """
+    Paraphrases reuse a cached roadmap; titles that differ in a
+    distinguishing word (language, subject) must not.
+    """
+
+    def match(self, cached, asked):
+        index = GoalIndex()
+        normalized = normalize_goal_title(cached)
+        index.add(cache_key(normalized), normalized)
+        return index.query(normalize_goal_title(asked), groups=SYNONYM_GROUPS)
+
+    def test_paraphrase_matches(self):
+        self.assertIsNotNone(self.match("DSA using Java", "learn data structures in java"))
+
+    def test_different_language_does_not_match(self):
+        self.assertIsNone(self.match("DSA in Java", "DSA in Python"))
+
+    def test_sql_vs_nosql_does_not_match(self):
+        self.assertIsNone(self.match("SQL for beginners", "NoSQL for beginners"))
+
+    def test_cpp_vs_c_does_not_match(self):
+        self.assertIsNone(self.match("C++ DSA", "C DSA"))
+
+    def test_extra_framework_does_not_match(self):
+        self.assertIsNone(self.match("web development", "web development with django"))
@@ -19,6 +19,8 @@ urlpatterns = [
     # ✅ Task detail + AI chat (single powerful route)
     path("tasks/<int:task_id>/", views.task_detail, name="task_detail"),
     path("tasks/<int:task_id>/need-help/", views.task_need_help, name="task_need_help"),
+    path("tasks/<int:task_id>/chat/stream/", views.task_chat_stream, name="task_chat_stream"),
+    path("tasks/<int:task_id>/ai-status/", views.task_ai_status, name="task_ai_status"),
 
     # ================= NOTES =================
     path("notes/add/", views.add_note, name="add_note"),
@@ -28,6 +30,7 @@ urlpatterns = [
     # ================= LEARNING GOALS =================
     path("goals/", views.learning_goals, name="learning_goals"),
     path("goals/<int:goal_id>/start/", views.start_learning, name="start_learning"),
+    path("goals/<int:goal_id>/ai-status/", views.goal_ai_status, name="goal_ai_status"),
 
     # ================= STUDY =================
     path("study/add/", views.add_study_session, name="add_study_session"),
@@ -35,6 +38,11 @@ urlpatterns = [
 
     # ================= PROFILE =================
     path("profile/", views.profile, name="profile"),
+    path("profile/xp-history/", views.xp_history, name="xp_history"),
+    path("profile/heatmap/", views.heatmap_year, name="heatmap_year"),
+
+    # ================= LEADERBOARD =================
+    path("leaderboard/", views.leaderboard, name="leaderboard"),
 
     # ================= GITHUB =================
     path("github/add/", views.add_github_username, name="add_github"),
@@ -1,24 +1,48 @@
+import json
+import uuid
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.core.paginator import Paginator
 from django.utils import timezone
+from django.db import IntegrityError, transaction
 from django.db.models import Sum
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_POST
 
 from .models import (
     Subject, Task, TaskMessage, Note, StudyStreak, LearningGoal,
     StudySession, Topic, Platform, PlatformAccount,
-    UserStats, DailyActivity, Resource
+    UserStats, DailyActivity, Resource, LearningTrack
 )
 
+from .templatetags.markdown_extras import markdownify
+
 from .forms import (
     SignupForm, SubjectForm, TaskForm, NoteForm,
     LearningGoalForm, StudySessionForm, GitHubUsernameForm
 )
 
-from core.services.groq import generate_goal_solution, generate_task_ai_reply
-from core.services.resources import seed_resources_by_goal
+from core.services.ai_limits import AIBusy, admit
+from core.services.groq import StreamError, is_ai_error
+from core.services.task_ai import generate_task_reply, stream_task_reply
+from core.services.ai_jobs import (
+    help_pending, is_replay, note_goal_opened, prefetch_goal_roadmap, request_goal_roadmap,
+    request_material_index, request_task_help, store_task_reply,
+    task_help_prompt, wait_for_task_reply
+)
+from core.services.resources import ensure_catalog_seeded, resources_for_goal
+from core.services.xp import PLATFORM_XP_FIELDS, commit_platform_xp
+from core.services.xp_history import get_xp_series
+from core.services.leaderboard import get_rank_context, leaderboard_queryset
+from core.services.rollups import (
+    get_top, platform_board, record_study_session, track_board
+)
+from core.services.heatmap import (
+    get_year_payload, heatmap_version, refresh_heatmap_days
+)
 
 
 # ==================================================
@@ -109,6 +133,7 @@ def tasks_hub(request):
             if task.task_type == "assignment" and task.material:
                 task.needs_help = True
             task.save()
+            request_material_index(task)
             return redirect("tasks_hub")
     else:
         form = TaskForm()
@@ -129,64 +154,210 @@ def tasks_hub(request):
 @login_required
 def toggle_task(request, task_id):
     task = get_object_or_404(Task, id=task_id, user=request.user)
+    previously_completed_at = task.completed_at
+
     task.completed = not task.completed
+    task.completed_at = timezone.now() if task.completed else None
     task.save()
+
     if task.completed:
         update_streak(request.user)
+    elif previously_completed_at:
+        refresh_heatmap_days(
+            request.user.id,
+            [timezone.localtime(previously_completed_at).date()]
+        )
     return redirect("tasks_hub")
 
 
 @login_required
 def task_detail(request, task_id):
     task = get_object_or_404(Task, id=task_id, user=request.user)
-    messages = task.messages.all()
 
     if request.method == "POST":
         user_msg = request.POST.get("message")
-        if user_msg:
-            TaskMessage.objects.create(task=task, sender="user", content=user_msg)
+        client_token = _client_token(request)
+
+        # a replayed submission just shows the stored conversation;
+        # only the request that saved the question spends quota
+        message = None
+        if user_msg and not is_replay(task, client_token):
+            message = _save_question(task, user_msg, client_token)
 
+        if message:
             try:
-                ai_reply = generate_task_ai_reply(task, user_msg)
+                admit(request.user)
+            except AIBusy as e:
+                message.delete()
+                return _busy_page(request, task, e, draft=user_msg)
+
+            try:
+                ai_reply = generate_task_reply(task, user_msg, before=message.id)
             except Exception:
-                ai_reply = "AI error. Try again."
+                ai_reply = ""
 
-            TaskMessage.objects.create(task=task, sender="ai", content=ai_reply)
-            task.ai_solution = ai_reply
-            task.needs_help = False
-            task.save()
+            if is_ai_error(ai_reply):
+                store_task_reply(task, ai_reply or "AI error. Try again.", client_token, error=True)
+            else:
+                store_task_reply(task, ai_reply, client_token)
 
         return redirect("task_detail", task_id=task.id)
 
+    return _task_page(request, task)
+
+
+def _task_page(request, task, status=200, busy=None, draft=""):
     return render(request, "core/task_detail.html", {
         "task": task,
-        "messages": messages
-    })
+        "messages": task.messages.all(),
+        "client_token": uuid.uuid4().hex,
+        "busy": busy,
+        "draft": draft,
+    }, status=status)
+
+
+def _client_token(request):
+    return request.POST.get("client_token", "").strip()[:64]
+
+
+def _save_question(task, content, client_token):
+    """
+    The new user message, or None if a concurrent request with the
+    same idempotency token saved it first.
+    """
+    try:
+        with transaction.atomic():
+            return TaskMessage.objects.create(
+                task=task, sender="user", content=content, client_token=client_token
+            )
+    except IntegrityError:
+        return None
 
 
 @login_required
 def task_need_help(request, task_id):
     task = get_object_or_404(Task, id=task_id, user=request.user)
 
-    prompt = f"""
-User needs help with this task.
+    # a repeated click while the job runs is a no-op; don't charge it
+    if not help_pending(task):
+        try:
+            admit(request.user)
+        except AIBusy as e:
+            return _busy_page(request, task, e)
 
-Title: {task.title}
-Subject: {task.custom_subject or task.subject}
-Type: {task.task_type}
-"""
+        request_task_help(task, task_help_prompt(task))
+
+    return redirect("task_detail", task_id=task.id)
+
+
+@login_required
+def task_ai_status(request, task_id):
+    """
+    Polled by the task page while a background reply is pending.
+    Returns the AI messages newer than ?after=<message id>.
+    """
+    task = get_object_or_404(Task, id=task_id, user=request.user)
 
     try:
-        ai_reply = generate_task_ai_reply(task, prompt)
-    except Exception:
-        ai_reply = "AI error — please try again."
+        after = int(request.GET.get("after", 0))
+    except ValueError:
+        after = 0
 
-    TaskMessage.objects.create(task=task, sender="ai", content=ai_reply)
-    task.ai_solution = ai_reply
-    task.needs_help = False
-    task.save()
+    messages = task.messages.filter(sender="ai", id__gt=after).values("id", "content")
 
-    return redirect("task_detail", task_id=task.id)
+    return JsonResponse({
+        "status": task.ai_status,
+        "messages": list(messages),
+    })
+
+
+def _busy_response(error):
+    # for the streaming chat script, which shows the text itself
+    response = HttpResponse(str(error), status=429, content_type="text/plain; charset=utf-8")
+    response["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def _busy_page(request, task, error, draft=""):
+    # plain form posts and links get the task page with the notice
+    response = _task_page(request, task, status=429, busy=error, draft=draft)
+    response["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def _store_stream_reply(task, parts, client_token):
+    # an upstream error mid-stream makes the partial reply an error message
+    failed = not parts or any(isinstance(part, StreamError) for part in parts)
+    return store_task_reply(task, "".join(parts) or "AI error. Try again.", client_token, error=failed)
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@login_required
+@require_POST
+def task_chat_stream(request, task_id):
+    """
+    Same as the task_detail POST, but relays Groq tokens as server-sent
+    events and stores the AI message once the stream completes.
+    """
+    task = get_object_or_404(Task, id=task_id, user=request.user)
+    user_msg = request.POST.get("message", "").strip()
+
+    if not user_msg:
+        return JsonResponse({"error": "Empty message"}, status=400)
+
+    client_token = _client_token(request)
+    question = None
+
+    # only the request that saved the question spends quota
+    if not is_replay(task, client_token):
+        question = _save_question(task, user_msg, client_token)
+
+    if question:
+        try:
+            admit(request.user)
+        except AIBusy as e:
+            question.delete()
+            return _busy_response(e)
+
+    def events():
+        parts = []
+        tokens = stream_task_reply(task, user_msg, before=question.id)
+        try:
+            for token in tokens:
+                parts.append(token)
+                yield _sse("token", {"token": token})
+        except GeneratorExit:
+            # client went away: finish the reply server-side, so a retry
+            # of this submission (a replay) still gets it
+            try:
+                parts.extend(tokens)
+            except Exception:
+                parts.append(StreamError("\n\nAI error. Try again."))
+            _store_stream_reply(task, parts, client_token)
+            raise
+        except Exception:
+            parts = [StreamError("AI error. Try again.")]
+            yield _sse("token", {"token": parts[0]})
+
+        message = _store_stream_reply(task, parts, client_token)
+        yield _sse("done", {"id": message.id})
+
+    def replay():
+        # the original request owns the model call; relay its reply
+        message = wait_for_task_reply(task, client_token)
+        yield _sse("token", {"token": message.content if message else "AI error. Try again."})
+        yield _sse("done", {"id": message.id if message else None})
+
+    response = StreamingHttpResponse(
+        events() if question else replay(),
+        content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 # ==================================================
@@ -265,7 +436,85 @@ def profile(request):
     }
 
     return render(request, "core/profile.html", context)
-    
+
+
+@login_required
+def xp_history(request):
+    try:
+        days = min(int(request.GET.get("days", 365)), 3650)
+    except ValueError:
+        days = 365
+
+    return JsonResponse({
+        "days": days,
+        "series": get_xp_series(request.user, days=days),
+    })
+
+
+
+def _heatmap_year(request):
+    year = request.GET.get("year", "")
+    if year.isdigit() and 1970 <= int(year) <= 2100:
+        return int(year)
+    return timezone.localdate().year
+
+
+def _heatmap_version(request):
+    if not hasattr(request, "_heatmap_version"):
+        request._heatmap_version = heatmap_version(request.user.id)
+    return request._heatmap_version
+
+
+def _heatmap_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    return f"{request.user.id}-{_heatmap_year(request)}-{_heatmap_version(request)}"
+
+
+@login_required
+@condition(etag_func=_heatmap_etag)
+def heatmap_year(request):
+    payload = get_year_payload(
+        request.user.id,
+        _heatmap_year(request),
+        _heatmap_version(request)
+    )
+
+    response = JsonResponse(payload)
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+# ==================================================
+# LEADERBOARD
+# ==================================================
+
+@login_required
+def leaderboard(request):
+    window = request.GET.get("window", "all")
+    board = request.GET.get("board", "all")
+
+    boards = [("all", "All activity")]
+    boards += [(platform_board(slug), slug.title()) for slug in PLATFORM_XP_FIELDS]
+    boards += [
+        (track_board(track_id), name)
+        for track_id, name in LearningTrack.objects.values_list("id", "name")
+    ]
+
+    context = {
+        "window": window,
+        "board": board,
+        "boards": boards,
+    }
+
+    if window in ("week", "month"):
+        context["top"] = get_top(window, board)
+    else:
+        paginator = Paginator(leaderboard_queryset(), 50)
+        context["page_obj"] = paginator.get_page(request.GET.get("page"))
+        context["rank_context"] = get_rank_context(request.user)
+
+    return render(request, "core/leaderboard.html", context)
 
 
 # ==================================================
@@ -353,6 +602,7 @@ def learning_goals(request):
             goal = form.save(commit=False)
             goal.user = request.user
             goal.save()
+            prefetch_goal_roadmap(goal)
             return redirect("learning_goals")
     else:
         form = LearningGoalForm()
@@ -366,14 +616,15 @@ def learning_goals(request):
 @login_required
 def start_learning(request, goal_id):
     goal = get_object_or_404(LearningGoal, id=goal_id, user=request.user)
+    note_goal_opened(goal)
 
     if not goal.ai_solution:
-        goal.ai_solution = generate_goal_solution(goal.title)
-        goal.save()
+        request_goal_roadmap(goal)
+        goal.refresh_from_db(fields=["ai_solution", "ai_status"])
 
-    seed_resources_by_goal(goal.title)
+    ensure_catalog_seeded()
 
-    resources = Resource.objects.all().order_by("-id")[:12]
+    resources = resources_for_goal(goal.title) or Resource.objects.order_by("-id")[:12]
 
     return render(request, "core/start_learning.html", {
         "goal": goal,
@@ -381,6 +632,15 @@ def start_learning(request, goal_id):
         "resources": resources
     })
 
+@login_required
+def goal_ai_status(request, goal_id):
+    goal = get_object_or_404(LearningGoal, id=goal_id, user=request.user)
+
+    return JsonResponse({
+        "status": goal.ai_status,
+        "html": markdownify(goal.ai_solution) if goal.ai_solution else "",
+    })
+
 # ==================================================
 # STUDY
 # ==================================================
@@ -394,6 +654,7 @@ def add_study_session(request):
             session.user = request.user
             session.study_date = timezone.now().date()
             session.save()
+            record_study_session(session)
             update_streak(request.user)
             return redirect("dashboard")
     else:
@@ -485,11 +746,14 @@ def disconnect_github(request):
         platform__slug="github"
     ).delete()
 
-    stats, _ = UserStats.objects.get_or_create(user=request.user)
-    stats.github_username = None
-    stats.github_xp = 0
-    stats.total_commits = 0
-    stats.recalculate_totals()
+    commit_platform_xp(
+        request.user,
+        "github",
+        0,
+        github_username=None,
+        github_repos=0,
+        total_commits=0,
+    )
 
     return redirect("profile")
 
@@ -562,13 +826,13 @@ def disconnect_leetcode(request):
         platform__slug="leetcode"
     ).delete()
 
-    stats, _ = UserStats.objects.get_or_create(user=request.user)
-    stats.leetcode_solved = 0
-    stats.leetcode_xp = 0
-    stats.leetcode_username = ""
-    stats.save()
-
-    stats.recalculate_totals()
+    commit_platform_xp(
+        request.user,
+        "leetcode",
+        0,
+        leetcode_username="",
+        leetcode_solved=0,
+    )
 
     return redirect("profile")
 
@@ -621,12 +885,12 @@ def disconnect_gfg(request):
         platform__slug="gfg"
     ).delete()
 
-    stats, _ = UserStats.objects.get_or_create(user=request.user)
-    stats.gfg_solved = 0
-    stats.gfg_xp = 0
-    stats.gfg_username = ""
-    stats.save()
-
-    stats.recalculate_totals()
+    commit_platform_xp(
+        request.user,
+        "gfg",
+        0,
+        gfg_username="",
+        gfg_solved=0,
+    )
 
     return redirect("profile")
\ No newline at end of file